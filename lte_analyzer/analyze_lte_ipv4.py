@@ -5,6 +5,9 @@ Parses LTE simulation traces and extracts UDP/TCP statistics
 """
 import re
 import pandas as pd
+import matplotlib
+if matplotlib.get_backend().lower() != 'agg':
+    matplotlib.use('Agg')
 import matplotlib.pyplot as plt
 import numpy as np
 import os
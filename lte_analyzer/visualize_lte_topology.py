@@ -4,12 +4,19 @@ LTE Network Topology Visualizer
 Shows UEs, eNBs, EPC components, and buildings with proper positions
 """
 import matplotlib
-matplotlib.use('Agg')
-import matplotlib.pyplot as plt
+if matplotlib.get_backend().lower() != 'agg':
+    matplotlib.use('Agg')
 import matplotlib.patches as mpatches
-from matplotlib.patches import Rectangle, FancyBboxPatch
+from matplotlib.patches import Rectangle, PathPatch
+from matplotlib.path import Path
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
 import numpy as np
 import os
+import argparse
+import hashlib
+import json
+from concurrent.futures import ProcessPoolExecutor
 from io import BytesIO
 try:
     import imageio.v2 as imageio
@@ -21,6 +28,12 @@ FIELD_SIZE = 400.0
 N_UES = 10
 OUTPUT_DIR = "Lte_outputs"
 
+# GIF animation parameters; the RandomWalk is seeded so the GIF is reproducible
+GIF_SEED = 0
+GIF_FRAMES = 20
+GIF_SIM_SECS = 12.0
+GIF_SPEED_MPS = 5.0
+
 # Node positions
 def get_node_positions():
     positions = {}
@@ -49,50 +62,52 @@ def get_node_positions():
     return positions
 
 # Building positions (from C++ code)
+# Bounds are kept as one (7, 6) array, columns: xmin, xmax, ymin, ymax, zmin, zmax
+_BLDG_NAMES = ('leftBelow', 'rightBelow', 'leftAbove', 'rightAbove',
+               'cluster250a', 'cluster250b', 'cluster50')
+_BLDG_BOUNDS0 = np.array([
+    [0.0, 60.0, 96.0, 104.0, 0.0, 10.0],
+    [340.0, 400.0, 96.0, 104.0, 0.0, 10.0],
+    [0.0, 60.0, 296.0, 304.0, 0.0, 10.0],
+    [340.0, 400.0, 296.0, 304.0, 0.0, 10.0],
+    [80.0, 140.0, 220.0, 228.0, 0.0, 15.0],
+    [170.0, 250.0, 220.0, 228.0, 0.0, 12.0],
+    [255.0, 335.0, 20.0, 28.0, 0.0, 18.0],
+], dtype=np.float64)
+
 def get_buildings():
-    buildings = [
-        {"name": "leftBelow", "bounds": (0.0, 60.0, 96.0, 104.0, 0.0, 10.0)},
-        {"name": "rightBelow", "bounds": (340.0, 400.0, 96.0, 104.0, 0.0, 10.0)},
-        {"name": "leftAbove", "bounds": (0.0, 60.0, 296.0, 304.0, 0.0, 10.0)},
-        {"name": "rightAbove", "bounds": (340.0, 400.0, 296.0, 304.0, 0.0, 10.0)},
-        {"name": "cluster250a", "bounds": (80.0, 140.0, 220.0, 228.0, 0.0, 15.0)},
-        {"name": "cluster250b", "bounds": (170.0, 250.0, 220.0, 228.0, 0.0, 12.0)},
-        {"name": "cluster50", "bounds": (255.0, 335.0, 20.0, 28.0, 0.0, 18.0)},
-    ]
-    return buildings
+    return _BLDG_NAMES, _BLDG_BOUNDS0.copy()
 
 # Time-scheduled wall (building) movement to match C++ schedules
 def buildings_at_time(t_seconds: float):
     # Start with defaults
-    base = {b["name"]: list(b["bounds"]) for b in get_buildings()}
+    bounds = _BLDG_BOUNDS0.copy()
     # Movements per C++ (approx at 5,6,7,8,10,11,12s)
     # cluster250a moves at 5s, 8s, 12s
     if t_seconds >= 5.0:
-        base["cluster250a"] = [150.0, 210.0, 180.0, 188.0, 0.0, 8.0]  # (x:150-210, y:180-188, z:0-8)
+        bounds[4] = [150.0, 210.0, 180.0, 188.0, 0.0, 8.0]  # (x:150-210, y:180-188, z:0-8)
     if t_seconds >= 8.0:
-        base["cluster250a"] = [250.0, 310.0, 130.0, 138.0, 0.0, 8.0]
+        bounds[4] = [250.0, 310.0, 130.0, 138.0, 0.0, 8.0]
     if t_seconds >= 12.0:
-        base["cluster250a"] = [100.0, 160.0, 280.0, 288.0, 0.0, 8.0]
+        bounds[4] = [100.0, 160.0, 280.0, 288.0, 0.0, 8.0]
     # cluster250b moves at 6s, 10s
     if t_seconds >= 6.0:
-        base["cluster250b"] = [200.0, 280.0, 180.0, 188.0, 0.0, 8.0]
+        bounds[5] = [200.0, 280.0, 180.0, 188.0, 0.0, 8.0]
     if t_seconds >= 10.0:
-        base["cluster250b"] = [130.0, 210.0, 300.0, 308.0, 0.0, 8.0]
+        bounds[5] = [130.0, 210.0, 300.0, 308.0, 0.0, 8.0]
     # cluster50 moves at 7s, 11s
     if t_seconds >= 7.0:
-        base["cluster50"] = [255.0, 335.0, 80.0, 88.0, 0.0, 8.0]
+        bounds[6] = [255.0, 335.0, 80.0, 88.0, 0.0, 8.0]
     if t_seconds >= 11.0:
-        base["cluster50"] = [215.0, 295.0, 180.0, 188.0, 0.0, 8.0]
-    # Return list like get_buildings()
-    out = []
-    for name, b in base.items():
-        out.append({"name": name, "bounds": tuple(b)})
-    return out
+        bounds[6] = [215.0, 295.0, 180.0, 188.0, 0.0, 8.0]
+    # Same (names, bounds) pair as get_buildings()
+    return _BLDG_NAMES, bounds
 
 # Persistent RandomWalk state for UEs (except Sayed and Sadia)
 _MOBILE_RW_STATE = {
     'initialized': False,
     'positions': {},  # key -> (x,y,z)
+    'rng': None,
 }
 
 def _init_mobile_positions():
@@ -102,6 +117,7 @@ def _init_mobile_positions():
         key = f'ue_{i}'
         positions[key] = (base[key][0], base[key][1], base[key][2])
     _MOBILE_RW_STATE['positions'] = positions
+    _MOBILE_RW_STATE['rng'] = np.random.default_rng(GIF_SEED)
     _MOBILE_RW_STATE['initialized'] = True
 
 def _advance_randomwalk_positions(dt_seconds: float, speed_mps: float = 5.0):
@@ -109,24 +125,52 @@ def _advance_randomwalk_positions(dt_seconds: float, speed_mps: float = 5.0):
     for i in range(1, N_UES - 1):
         key = f'ue_{i}'
         x, y, z = _MOBILE_RW_STATE['positions'][key]
-        angle = np.random.uniform(0, 2 * np.pi)
+        angle = _MOBILE_RW_STATE['rng'].uniform(0, 2 * np.pi)
         step = speed_mps * dt_seconds
         nx = max(0.0, min(FIELD_SIZE, x + step * np.cos(angle)))
         ny = max(0.0, min(FIELD_SIZE, y + step * np.sin(angle)))
         _MOBILE_RW_STATE['positions'][key] = (nx, ny, z)
 
+# Coverage overlay: eNBs never move, so the translucent disks are rasterized once
+_COVERAGE_EXTENT = (-50.0, FIELD_SIZE + 50.0, -50.0, FIELD_SIZE + 200.0)
+_COVERAGE_RADIUS = 150.0
+_COVERAGE_SPRITES = {}  # enb (x, y) tuple -> (H, W, 4) float32 RGBA
+
+def _coverage_overlay(enb_xy):
+    overlay = _COVERAGE_SPRITES.get(enb_xy)
+    if overlay is not None:
+        return overlay
+    x0, x1, y0, y1 = _COVERAGE_EXTENT
+    # One pixel per meter
+    xs = np.arange(x0, x1, dtype=np.float32) + 0.5
+    ys = np.arange(y0, y1, dtype=np.float32) + 0.5
+    gx, gy = np.meshgrid(xs, ys)
+    overlay = np.zeros(gx.shape + (4,), dtype=np.float32)
+    overlay[..., :3] = (0.0, 1.0, 1.0)  # cyan
+    # Composite alpha=0.15 disks the same way stacked patches would
+    transparency = np.ones(gx.shape, dtype=np.float32)
+    for x, y in enb_xy:
+        inside = (gx - x) ** 2 + (gy - y) ** 2 < _COVERAGE_RADIUS ** 2
+        transparency[inside] *= 0.85
+    overlay[..., 3] = 1.0 - transparency
+    _COVERAGE_SPRITES[enb_xy] = overlay
+    return overlay
+
 # Draw function now takes buildings input
 def plot_topology(use_tower_image=False, positions_override=None, buildings_override=None):
     """Create LTE network topology visualization"""
     
-    fig, ax = plt.subplots(figsize=(14, 16))
+    # Object-oriented API: no pyplot figure registry, nothing to plt.close()
+    fig = Figure(figsize=(14, 16))
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot(111)
     
     positions = positions_override if positions_override else get_node_positions()
-    buildings = buildings_override if buildings_override else get_buildings()
+    names, bounds = buildings_override if buildings_override else get_buildings()
     
     # Draw buildings (walls) in red
-    for building in buildings:
-        xmin, xmax, ymin, ymax, zmin, zmax = building["bounds"]
+    for i, name in enumerate(names):
+        xmin, xmax, ymin, ymax, zmin, zmax = bounds[i]
         width = xmax - xmin
         height = ymax - ymin
         color = '#cc0000'  # red walls
@@ -135,7 +179,7 @@ def plot_topology(use_tower_image=False, positions_override=None, buildings_over
                          edgecolor='darkred', linewidth=2.0)
         ax.add_patch(rect)
         ax.text(xmin + width/2, ymin + height/2, 
-               f"{building['name']}\n{zmax}m", 
+               f"{name}\n{zmax}m", 
                fontsize=7, ha='center', va='center', color='white', weight='bold')
 
     # Draw connections
@@ -156,12 +200,10 @@ def plot_topology(use_tower_image=False, positions_override=None, buildings_over
     ax.plot([rh_pos[0], pgw_pos[0]], [rh_pos[1], pgw_pos[1]], 
            'orange', linewidth=3, alpha=0.7, label='Internet Link')
     
-    # Coverage circles for eNBs (illustrative)
-    for i in range(3):
-        enb_pos = positions[f'enb_{i}']
-        circle = plt.Circle((enb_pos[0], enb_pos[1]), 150, 
-                          color='cyan', alpha=0.15, linestyle='--', fill=True)
-        ax.add_patch(circle)
+    # Coverage circles for eNBs (illustrative), drawn as one cached RGBA sprite
+    enb_xy = tuple((positions[f'enb_{i}'][0], positions[f'enb_{i}'][1]) for i in range(3))
+    ax.imshow(_coverage_overlay(enb_xy), extent=_COVERAGE_EXTENT,
+              origin='lower', zorder=1, interpolation='bilinear')
     
     # Draw UEs
     for i in range(N_UES):
@@ -196,25 +238,21 @@ def plot_topology(use_tower_image=False, positions_override=None, buildings_over
                    textcoords='offset points', fontsize=9, weight='bold')
 
     # Draw eNBs
+    # Tower bodies and antennas for all eNBs are batched into one path each
+    tower_verts, tower_codes = [], []
+    antenna_verts, antenna_codes = [], []
     for i in range(3):
         pos = positions[f'enb_{i}']
         if use_tower_image:
             tower_width = 20
             tower_height = 30
-            tower_rect = FancyBboxPatch(
-                (pos[0] - tower_width/2, pos[1] - tower_height/2),
-                tower_width, tower_height,
-                boxstyle="round,pad=0.05",
-                facecolor='darkgray', edgecolor='black', linewidth=2,
-                zorder=4
-            )
-            ax.add_patch(tower_rect)
-            triangle = plt.Polygon([
-                (pos[0], pos[1] + tower_height/2 + 15),
-                (pos[0] - 10, pos[1] + tower_height/2),
-                (pos[0] + 10, pos[1] + tower_height/2)
-            ], facecolor='red', edgecolor='black', linewidth=1, zorder=4)
-            ax.add_patch(triangle)
+            x0, x1 = pos[0] - tower_width/2, pos[0] + tower_width/2
+            y0, y1 = pos[1] - tower_height/2, pos[1] + tower_height/2
+            tower_verts += [(x0, y0), (x1, y0), (x1, y1), (x0, y1), (x0, y0)]
+            tower_codes += [Path.MOVETO] + [Path.LINETO] * 3 + [Path.CLOSEPOLY]
+            antenna_verts += [(pos[0], y1 + 15), (pos[0] - 10, y1), (pos[0] + 10, y1),
+                              (pos[0], y1 + 15)]
+            antenna_codes += [Path.MOVETO, Path.LINETO, Path.LINETO, Path.CLOSEPOLY]
         else:
             ax.scatter(pos[0], pos[1], c='darkgray', s=400, marker='^', 
                       edgecolors='black', linewidth=3, zorder=4)
@@ -222,6 +260,13 @@ def plot_topology(use_tower_image=False, positions_override=None, buildings_over
                    (pos[0], pos[1]), xytext=(25, 5), 
                    textcoords='offset points', fontsize=11, weight='bold',
                    bbox=dict(boxstyle='round,pad=0.3', facecolor='yellow', alpha=0.7))
+    if tower_verts:
+        ax.add_patch(PathPatch(Path(np.array(tower_verts), tower_codes),
+                               facecolor='darkgray', edgecolor='black', linewidth=2,
+                               zorder=4))
+        ax.add_patch(PathPatch(Path(np.array(antenna_verts), antenna_codes),
+                               facecolor='red', edgecolor='black', linewidth=1,
+                               zorder=4))
     
     # Draw EPC nodes
     ax.scatter(pgw_pos[0], pgw_pos[1], c='purple', s=300, marker='s', 
@@ -264,11 +309,36 @@ def plot_topology(use_tower_image=False, positions_override=None, buildings_over
     ax.text(0.02, 0.98, info_text, transform=ax.transAxes, 
            fontsize=10, verticalalignment='top',
            bbox=dict(boxstyle='round', facecolor='lightyellow', alpha=0.9))
-    plt.tight_layout()
+    fig.tight_layout()
     return fig
 
+def _render_frame(args):
+    """Render one GIF frame in a worker process and return it as an image array"""
+    pos, walls = args
+    fig = plot_topology(use_tower_image=False, positions_override=pos, buildings_override=walls)
+    buf = BytesIO()
+    fig.savefig(buf, format='png', dpi=150, bbox_inches='tight')
+    buf.seek(0)
+    try:
+        return imageio.imread(buf)
+    finally:
+        buf.close()
+
+def _gif_params_hash(frame_args):
+    """Short digest of everything that determines the GIF contents
+
+    Covers the node and building positions of every frame, this module's
+    source (drawing code and GIF settings) and the matplotlib version.
+    """
+    frames = [(sorted(pos.items()), names, walls.tolist()) for pos, (names, walls) in frame_args]
+    digest = hashlib.blake2b(json.dumps([matplotlib.__version__, frames]).encode())
+    with open(__file__, 'rb') as f:
+        digest.update(f.read())
+    return digest.hexdigest()[:12]
+
 # Generate animated GIF with moving walls and RandomWalk-like UEs
-def save_static_and_gif():
+def save_static_and_gif(make_gif=True, force=False):
+    """Write the static PNG and, unless disabled, the GIF; return the GIF path or None"""
     os.makedirs(OUTPUT_DIR, exist_ok=True)
     if not _MOBILE_RW_STATE['initialized']:
         _init_mobile_positions()
@@ -277,49 +347,65 @@ def save_static_and_gif():
     fig = plot_topology(use_tower_image=True, buildings_override=get_buildings(), positions_override=base)
     png_path = os.path.join(OUTPUT_DIR, 'lte_topology_visualization.png')
     fig.savefig(png_path, dpi=300, bbox_inches='tight')
-    plt.close(fig)
     print(f"✓ Topology visualization saved: {png_path}")
 
+    if not make_gif:
+        print("GIF generation disabled (--no-gif)")
+        return None
     if imageio is None:
         print("imageio not available; skipping GIF generation")
-        return
-    frames = []
-    total_frames = 20
-    total_sim_secs = 12.0
+        return None
+    gif_path = os.path.join(OUTPUT_DIR, 'lte_topology_animation.gif')
+    meta_path = gif_path + '.meta'
+    # Advance the RandomWalk sequentially up front; only plain dicts and arrays
+    # cross the process boundary, the figures are built inside the workers
+    frame_args = []
+    total_frames = GIF_FRAMES
+    total_sim_secs = GIF_SIM_SECS
     prev_t = 0.0
     for fidx in range(total_frames):
         t = total_sim_secs * (fidx / max(1, total_frames - 1))
         dt = t - prev_t
         prev_t = t
         # advance RW positions
-        _advance_randomwalk_positions(dt_seconds=dt, speed_mps=5.0)
+        _advance_randomwalk_positions(dt_seconds=dt, speed_mps=GIF_SPEED_MPS)
         # compose positions: fixed endpoints + mobile from state
         pos = get_node_positions()
         for key, xyz in _MOBILE_RW_STATE['positions'].items():
             pos[key] = xyz
-        walls = buildings_at_time(t)
-        fig = plot_topology(use_tower_image=False, positions_override=pos, buildings_override=walls)
-        buf = BytesIO()
-        fig.savefig(buf, format='png', dpi=150, bbox_inches='tight')
-        buf.seek(0)
-        try:
-            img = imageio.imread(buf)
-            frames.append(img)
-        finally:
-            buf.close()
-        plt.close(fig)
-    gif_path = os.path.join(OUTPUT_DIR, 'lte_topology_animation.gif')
+        frame_args.append((pos, buildings_at_time(t)))
+    # The frame inputs are cheap to compute, so the cached GIF is checked
+    # against them rather than against the parameters that produce them
+    params_hash = _gif_params_hash(frame_args)
+    if not force and os.path.exists(gif_path) and os.path.exists(meta_path):
+        with open(meta_path) as f:
+            if f.read().strip() == params_hash:
+                print(f"✓ Topology animation up to date: {gif_path} (use --force to rebuild)")
+                return gif_path
+    workers = min(total_frames, os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        frames = list(executor.map(_render_frame, frame_args))
     imageio.mimsave(gif_path, frames, duration=0.25, loop=0)
+    with open(meta_path, 'w') as f:
+        f.write(params_hash + '\n')
     print(f"✓ Topology animation saved: {gif_path}")
+    return gif_path
 
 
 def main():
+    parser = argparse.ArgumentParser(description='LTE network topology visualizer')
+    parser.add_argument('--no-gif', action='store_true',
+                        help='only write the static PNG')
+    parser.add_argument('--force', action='store_true',
+                        help='regenerate the GIF even if the cached one is up to date')
+    args = parser.parse_args()
     print("Creating LTE network topology visualization...")
     print("=" * 60)
-    save_static_and_gif()
+    gif_path = save_static_and_gif(make_gif=not args.no_gif, force=args.force)
     print("\n✓ Visualization complete!")
     print(f"  Output: {OUTPUT_DIR}/lte_topology_visualization.png")
-    print(f"  Output: {OUTPUT_DIR}/lte_topology_animation.gif")
+    if gif_path is not None:
+        print(f"  Output: {gif_path}")
 
 if __name__ == "__main__":
     main()
@@ -4,11 +4,19 @@ LTE Network Animation with Moving Buildings
 Creates an animated visualization of the LTE simulation with moving buildings.
 """
 
+import matplotlib
+if matplotlib.get_backend().lower() != 'agg':
+    matplotlib.use('Agg')
 import matplotlib.pyplot as plt
 import matplotlib.animation as animation
+from matplotlib.collections import LineCollection
+from matplotlib.lines import Line2D
 import numpy as np
 import os
+import subprocess
 import sys
+from collections import deque
+from PIL import Image
 from datetime import datetime
 
 class LTEAnimator:
@@ -19,46 +27,57 @@ class LTEAnimator:
         self.n_enbs = 2
         
         # Node positions (will be updated during animation)
-        self.ue_positions = self._generate_ue_positions()
+        self.ue_xy = np.array(self._generate_ue_positions(), dtype=np.float64)
         self.enb_positions = self._generate_enb_positions()
         
         # Building movement schedule (matches the C++ code)
         self.building_movements = self._create_building_schedule()
-        
-        # Building heights for 3D visualization
-        self.building_heights = {
-            "cluster250a": 15.0,  # 15m high
-            "cluster250b": 12.0,  # 12m high  
-            "cluster50": 18.0,    # 18m high (tallest)
+        # Keyframes as parallel sorted arrays: name -> (times, xs, ys)
+        self._mv = {
+            name: (np.asarray([m["time"] for m in moves]),
+                   np.asarray([m["x"] for m in moves]),
+                   np.asarray([m["y"] for m in moves]))
+            for name, moves in self.building_movements.items()
         }
         
-        # Static buildings (corner buildings that don't move)
-        self.static_buildings = [
-            {"name": "leftBelow", "x": 0.0, "y": 96.0, "w": 60.0, "h": 8.0},
-            {"name": "rightBelow", "x": 340.0, "y": 96.0, "w": 60.0, "h": 8.0},
-            {"name": "leftAbove", "x": 0.0, "y": 296.0, "w": 60.0, "h": 8.0},
-            {"name": "rightAbove", "x": 340.0, "y": 296.0, "w": 60.0, "h": 8.0},
-        ]
+        # Static buildings (corner buildings that don't move), parallel arrays
+        self.static_names = ['leftBelow', 'rightBelow', 'leftAbove', 'rightAbove']
+        self.static_x = np.array([0.0, 340.0, 0.0, 340.0])
+        self.static_y = np.array([96.0, 96.0, 296.0, 296.0])
+        self.static_w = np.array([60.0, 60.0, 60.0, 60.0])
+        self.static_h = np.array([8.0, 8.0, 8.0, 8.0])
         
-        # Mobile buildings
-        self.mobile_buildings = [
-            {"name": "cluster250a", "w": 60.0, "h": 8.0},
-            {"name": "cluster250b", "w": 80.0, "h": 8.0},
-            {"name": "cluster50", "w": 80.0, "h": 8.0},
-        ]
+        # Mobile buildings, parallel arrays; heights for 3D visualization
+        self.mobile_names = ['cluster250a', 'cluster250b', 'cluster50']
+        self.mobile_w = np.array([60.0, 80.0, 80.0])
+        self.mobile_h = np.array([8.0, 8.0, 8.0])
+        self.mobile_heights = np.array([15.0, 12.0, 18.0])  # cluster50 is the tallest
+        self.mobile_labels = [f'{height:.0f}m' for height in self.mobile_heights]
         
         # Animation parameters
         self.duration = 15.0  # seconds
         self.fps = 2  # frames per second
         self.total_frames = int(self.duration * self.fps)
         
+        # Interpolated building trajectories, one (total_frames, 2) array per building
+        frame_times = np.arange(self.total_frames) / self.fps
+        self._bldg_xy = {
+            name: np.column_stack([np.interp(frame_times, times, xs),
+                                   np.interp(frame_times, times, ys)])
+            for name, (times, xs, ys) in self._mv.items()
+        }
+        # Same tracks stacked in mobile_names order, shape (n_mobile, total_frames, 2)
+        self._mobile_track = np.stack([self._bldg_xy[name] for name in self.mobile_names])
+        
         # UE movement simulation (RandomWalk2d parameters from C++ code)
         self.ue_speed = 50.0  # m/s (from C++ code)
         self.ue_bounds = (0, 400, 0, 400)  # Rectangle bounds
         self.ue_time_step = 1.0  # seconds (from C++ code)
+        self.ue_seed = 0  # RandomWalk seed; the generator is re-seeded at time 0
+        self._rng = np.random.default_rng(self.ue_seed)
         
-        # UE trails for movement visualization
-        self.ue_trails = [[] for _ in range(self.n_ues)]
+        # UE trails for movement visualization (last 20 positions each)
+        self.ue_trails = [deque(maxlen=20) for _ in range(self.n_ues)]
         
     def _generate_ue_positions(self):
         """Generate UE positions along diagonal"""
@@ -109,80 +128,49 @@ class LTEAnimator:
         # Sayed (UE 0) and Sadia (UE 9) are static
         # Only UEs 1-8 move with RandomWalk2d
         
-        # Reset to initial positions at start
+        # Reset to initial positions (and the walk's generator) at start
         if time == 0:
-            self.ue_positions = self._generate_ue_positions()
+            self.ue_xy = np.array(self._generate_ue_positions(), dtype=np.float64)
+            self._rng = np.random.default_rng(self.ue_seed)
             return
         
-        for i in range(1, self.n_ues - 1):  # UEs 1-8
-            # More realistic random walk simulation
-            # Use time-based seed for consistent movement
-            np.random.seed(i * 1000 + int(time * 10))
-            
-            # Random direction change (not every frame)
-            if np.random.random() < 0.3:  # 30% chance to change direction
-                angle = np.random.uniform(0, 2 * np.pi)
-                distance = self.ue_speed * 0.5  # Half the speed for smoother movement
-                
-                dx = distance * np.cos(angle)
-                dy = distance * np.sin(angle)
-                
-                # Update position
-                new_x = self.ue_positions[i][0] + dx
-                new_y = self.ue_positions[i][1] + dy
-                
-                # Apply boundary constraints (bounce back)
-                x_min, x_max, y_min, y_max = self.ue_bounds
-                if new_x < x_min or new_x > x_max:
-                    new_x = self.ue_positions[i][0] - dx
-                if new_y < y_min or new_y > y_max:
-                    new_y = self.ue_positions[i][1] - dy
-                
-                # Keep within bounds
-                new_x = max(x_min, min(x_max, new_x))
-                new_y = max(y_min, min(y_max, new_y))
-                
-                self.ue_positions[i] = (new_x, new_y)
+        # One batched draw for all mobile UEs from the walk's own generator
+        n_mobile = self.n_ues - 2
+        rng = self._rng
+        
+        # Random direction change (not every frame): 30% chance per UE
+        moving = rng.random(n_mobile) < 0.3
+        distance = self.ue_speed * 0.5  # Half the speed for smoother movement
+        # Uniform direction without trig: normalize an isotropic Gaussian vector
+        step = rng.standard_normal((n_mobile, 2))
+        step *= distance / np.linalg.norm(step, axis=1, keepdims=True)
+        step[~moving] = 0.0
+        
+        # Reflect off the walls (branchless, all UEs at once), then keep within bounds
+        x_min, x_max, y_min, y_max = self.ue_bounds
+        lo = np.array([x_min, y_min], dtype=np.float64)
+        hi = np.array([x_max, y_max], dtype=np.float64)
+        new = self.ue_xy[1:-1] + step
+        new = np.where(new > hi, 2 * hi - new, new)
+        new = np.where(new < lo, 2 * lo - new, new)
+        np.clip(new, lo, hi, out=new)
+        self.ue_xy[1:-1] = new
     
-    def _get_building_position_at_time(self, building_name, time):
-        """Get building position at specific time"""
-        movements = self.building_movements[building_name]
-        
-        # Find the appropriate position based on time
-        for i in range(len(movements) - 1):
-            if movements[i]["time"] <= time < movements[i + 1]["time"]:
-                return movements[i]["x"], movements[i]["y"]
-        
-        # Return last position if time is beyond last movement
-        return movements[-1]["x"], movements[-1]["y"]
-    
-    def _interpolate_building_position(self, building_name, time):
-        """Interpolate building position between movement points"""
-        movements = self.building_movements[building_name]
-        
-        # Find surrounding movement points
-        for i in range(len(movements) - 1):
-            if movements[i]["time"] <= time <= movements[i + 1]["time"]:
-                t1, t2 = movements[i]["time"], movements[i + 1]["time"]
-                x1, y1 = movements[i]["x"], movements[i]["y"]
-                x2, y2 = movements[i + 1]["x"], movements[i + 1]["y"]
-                
-                # Linear interpolation
-                if t2 == t1:
-                    return x1, y1
-                
-                alpha = (time - t1) / (t2 - t1)
-                x = x1 + alpha * (x2 - x1)
-                y = y1 + alpha * (y2 - y1)
-                return x, y
-        
-        # Return last position if time is beyond last movement
-        return movements[-1]["x"], movements[-1]["y"]
+    def _precompute_ue_track(self):
+        """Run the UE random walk for every frame, shape (total_frames, n_ues, 2)"""
+        track = np.empty((self.total_frames, self.n_ues, 2), dtype=np.float64)
+        for frame in range(self.total_frames):
+            self._simulate_ue_movement(frame / self.fps)
+            track[frame] = self.ue_xy
+        return track
     
     def create_animation(self):
         """Create the animated visualization"""
         print("Creating LTE animation with moving buildings...")
         
+        # Bake all UE positions once; frames only update artists
+        self._ue_track = self._precompute_ue_track()
+        
         # Set up the figure and axis
         fig, ax = plt.subplots(figsize=(12, 10))
         
@@ -192,17 +180,15 @@ class LTEAnimator:
         sadia_scatter = ax.scatter([], [], c='orange', s=150, marker='s', label='Sadia (Static)', zorder=5)
         enb_scatter = ax.scatter([], [], c='red', s=200, marker='^', label='eNBs', zorder=5)
         
-        # Trail lines for mobile UEs
-        trail_lines = []
-        for i in range(1, self.n_ues - 1):  # Only for mobile UEs
-            line, = ax.plot([], [], 'b-', alpha=0.3, linewidth=1)
-            trail_lines.append(line)
+        # Trails for all mobile UEs share one collection
+        trails_lc = LineCollection([], colors='b', alpha=0.3, linewidths=1)
+        ax.add_collection(trails_lc)
         
         # Static buildings
         static_rects = []
-        for building in self.static_buildings:
-            rect = plt.Rectangle((building["x"], building["y"]), 
-                               building["w"], building["h"], 
+        for i in range(len(self.static_names)):
+            rect = plt.Rectangle((self.static_x[i], self.static_y[i]), 
+                               self.static_w[i], self.static_h[i], 
                                facecolor='gray', alpha=0.7, zorder=2)
             ax.add_patch(rect)
             static_rects.append(rect)
@@ -210,14 +196,14 @@ class LTEAnimator:
         # Mobile buildings (will be updated in animation)
         mobile_rects = []
         mobile_height_texts = []
-        for i, building in enumerate(self.mobile_buildings):
-            rect = plt.Rectangle((0, 0), building["w"], building["h"], 
+        for i in range(len(self.mobile_names)):
+            rect = plt.Rectangle((0, 0), self.mobile_w[i], self.mobile_h[i], 
                                facecolor='red', alpha=0.8, zorder=3)
             ax.add_patch(rect)
             mobile_rects.append(rect)
             
-            # Add height labels for buildings
-            height_text = ax.text(0, 0, '', fontsize=8, ha='center', va='bottom',
+            # Add height labels for buildings (text is constant per building)
+            height_text = ax.text(0, 0, self.mobile_labels[i], fontsize=8, ha='center', va='bottom',
                                 bbox=dict(boxstyle='round,pad=0.2', facecolor='yellow', alpha=0.7))
             mobile_height_texts.append(height_text)
         
@@ -236,133 +222,166 @@ class LTEAnimator:
         ax.grid(True, alpha=0.3)
         ax.set_aspect('equal')
         
+        def init():
+            """Set constant state once before the first frame; animate() only touches moving artists"""
+            # eNBs are static, so their offsets are set here rather than per frame
+            enb_scatter.set_offsets(np.array(self.enb_positions))
+            # Trails start empty
+            for trail in self.ue_trails:
+                trail.clear()
+            # Last drawn (x, y) per mobile building
+            self._last_bldg_xy = [None] * len(self.mobile_names)
+            # Static artists stay out of the returned list so they remain in the
+            # cached background
+            return [ue_scatter, sayed_scatter, sadia_scatter, time_text,
+                    trails_lc, *mobile_rects, *mobile_height_texts]
+        
         def animate(frame):
             """Animation function called for each frame"""
             time = frame / self.fps
             
-            # Simulate UE movement for middle UEs (1-8)
-            self._simulate_ue_movement(time)
+            # UE positions come from the pre-baked track, so frames never
+            # re-run the simulation
+            ue_xy = self._ue_track[frame]
             
-            # Update UE positions
-            ue_x = [pos[0] for pos in self.ue_positions[1:-1]]
-            ue_y = [pos[1] for pos in self.ue_positions[1:-1]]
+            # Update scatter plots (views into the position array, no copies)
+            ue_scatter.set_offsets(ue_xy[1:-1])
+            sayed_scatter.set_offsets(ue_xy[:1])
+            sadia_scatter.set_offsets(ue_xy[-1:])
             
-            # Update scatter plots
-            ue_scatter.set_offsets(list(zip(ue_x, ue_y)))
-            sayed_scatter.set_offsets([self.ue_positions[0]])
-            sadia_scatter.set_offsets([self.ue_positions[-1]])
+            # Update trails for mobile UEs (1-8); deque drops the oldest point
+            for ue_idx in range(1, self.n_ues - 1):
+                self.ue_trails[ue_idx].append(tuple(ue_xy[ue_idx]))
+            trails_lc.set_segments([np.asarray(self.ue_trails[i])
+                                    for i in range(1, self.n_ues - 1)
+                                    if len(self.ue_trails[i]) > 1])
             
-            # Update eNB positions (static)
-            enb_x = [pos[0] for pos in self.enb_positions]
-            enb_y = [pos[1] for pos in self.enb_positions]
-            enb_scatter.set_offsets(list(zip(enb_x, enb_y)))
-            
-            # Update trails for mobile UEs
-            for i, line in enumerate(trail_lines):
-                ue_idx = i + 1  # UEs 1-8
-                self.ue_trails[ue_idx].append(self.ue_positions[ue_idx])
-                
-                # Keep only last 20 positions for trail
-                if len(self.ue_trails[ue_idx]) > 20:
-                    self.ue_trails[ue_idx] = self.ue_trails[ue_idx][-20:]
-                
-                if len(self.ue_trails[ue_idx]) > 1:
-                    trail_x = [pos[0] for pos in self.ue_trails[ue_idx]]
-                    trail_y = [pos[1] for pos in self.ue_trails[ue_idx]]
-                    line.set_data(trail_x, trail_y)
-            
-            # Update mobile building positions
-            for i, building in enumerate(self.mobile_buildings):
-                x, y = self._interpolate_building_position(building["name"], time)
+            # Update mobile building positions (skipped while a building is parked)
+            for i in range(len(self.mobile_names)):
+                x, y = self._mobile_track[i, frame]
+                if (x, y) == self._last_bldg_xy[i]:
+                    continue
                 mobile_rects[i].set_xy((x, y))
-                
-                # Update height labels
-                height = self.building_heights[building["name"]]
-                mobile_height_texts[i].set_position((x + building["w"]/2, y + building["h"] + 5))
-                mobile_height_texts[i].set_text(f'{height:.0f}m')
+                mobile_height_texts[i].set_position((x + self.mobile_w[i]/2,
+                                                     y + self.mobile_h[i] + 5))
+                self._last_bldg_xy[i] = (x, y)
             
             # Update time display
             time_text.set_text(f'Time: {time:.1f}s')
             
-            return [ue_scatter, sayed_scatter, sadia_scatter, enb_scatter, time_text] + mobile_rects
-        
-        # Create animation
-        anim = animation.FuncAnimation(fig, animate, frames=self.total_frames,
-                                     interval=1000/self.fps, blit=False, repeat=True)
+            # Only the artists that change are returned for redrawing
+            return [ue_scatter, sayed_scatter, sadia_scatter, time_text,
+                    trails_lc, *mobile_rects, *mobile_height_texts]
+        
+        # Moving artists are redrawn over a cached background; the legend is
+        # redrawn too so nothing moving covers it
+        dynamic = init()
+        animated = sorted([*dynamic, ax.get_legend()], key=lambda a: a.get_zorder())
+        for artist in animated:
+            artist.set_animated(True)
+        canvas = fig.canvas
+        canvas.draw()
+        background = canvas.copy_from_bbox(fig.bbox)
         
         # Save animation
         os.makedirs(self.output_dir, exist_ok=True)
         output_file = os.path.join(self.output_dir, 'lte_animation.gif')
         print(f"Saving animation to {output_file}...")
         
-        # Save as GIF
-        anim.save(output_file, writer='pillow', fps=self.fps)
-        
-        # Also save as MP4 if ffmpeg is available
-        try:
-            mp4_file = os.path.join(self.output_dir, 'lte_animation.mp4')
-            anim.save(mp4_file, writer='ffmpeg', fps=self.fps)
-            print(f"Also saved as MP4: {mp4_file}")
-        except:
+        mp4_file = os.path.join(self.output_dir, 'lte_animation.mp4')
+        use_ffmpeg = animation.writers.is_available('ffmpeg')
+        if not use_ffmpeg:
             print("MP4 format not available (ffmpeg not found)")
         
-        plt.show()
+        # Each frame is rasterized once; the same RGBA buffer becomes a GIF
+        # frame and is streamed to ffmpeg for the MP4
+        gif_frames = []
+        proc = None
+        try:
+            for frame in range(self.total_frames):
+                animate(frame)
+                canvas.restore_region(background)
+                for artist in animated:
+                    fig.draw_artist(artist)
+                buf = canvas.buffer_rgba()
+                gif_frames.append(Image.fromarray(np.asarray(buf)).convert('RGB'))
+                if use_ffmpeg:
+                    if proc is None:
+                        h, w = np.asarray(buf).shape[:2]
+                        proc = subprocess.Popen(
+                            [plt.rcParams['animation.ffmpeg_path'], "-y", "-loglevel", "error",
+                             "-f", "rawvideo", "-pix_fmt", "rgba", "-s", f"{w}x{h}",
+                             "-r", str(self.fps), "-i", "-",
+                             "-c:v", "libx264", "-pix_fmt", "yuv420p", mp4_file],
+                            stdin=subprocess.PIPE)
+                    proc.stdin.write(buf)
+        finally:
+            if proc is not None:
+                proc.stdin.close()
+                proc.wait()
+        
+        gif_frames[0].save(output_file, save_all=True, append_images=gif_frames[1:],
+                           duration=int(1000 / self.fps), loop=0)
+        
+        if proc is not None:
+            if proc.returncode != 0:
+                print(f"MP4 encoding failed (ffmpeg exited with status {proc.returncode})")
+            else:
+                print(f"Also saved as MP4: {mp4_file}")
+        
+        plt.close(fig)
         print("Animation complete!")
-        
-        return anim
     
     def create_static_plot(self):
         """Create a static plot showing the network layout"""
         fig, ax = plt.subplots(figsize=(12, 10))
         
-        # Plot UEs
-        ue_x = [pos[0] for pos in self.ue_positions]
-        ue_y = [pos[1] for pos in self.ue_positions]
+        # Node coordinates as (n, 2) arrays, stacked once
+        ue_xy = np.asarray(self.ue_xy)
+        enb_xy = np.asarray(self.enb_positions)
         
-        ax.scatter(ue_x[1:-1], ue_y[1:-1], c='blue', s=100, label='Mobile UEs', zorder=4)
-        ax.scatter([ue_x[0]], [ue_y[0]], c='cyan', s=150, marker='s', label='Sayed', zorder=5)
-        ax.scatter([ue_x[-1]], [ue_y[-1]], c='orange', s=150, marker='s', label='Sadia', zorder=5)
+        # Plot UEs; Sayed and Sadia share one square-marker collection
+        mobile = ax.scatter(ue_xy[1:-1, 0], ue_xy[1:-1, 1], c='blue', s=100, zorder=4)
+        endpoints = ue_xy[[0, -1]]
+        ax.scatter(endpoints[:, 0], endpoints[:, 1], c=['cyan', 'orange'], s=150,
+                   marker='s', zorder=5)
         
         # Plot eNBs
-        enb_x = [pos[0] for pos in self.enb_positions]
-        enb_y = [pos[1] for pos in self.enb_positions]
-        ax.scatter(enb_x, enb_y, c='red', s=200, marker='^', label='eNBs', zorder=5)
+        enbs = ax.scatter(enb_xy[:, 0], enb_xy[:, 1], c='red', s=200, marker='^', zorder=5)
+        
+        # Legend entries for the shared collection are proxies
+        legend_handles = [
+            (mobile, 'Mobile UEs'),
+            (Line2D([], [], color='cyan', marker='s', markersize=10, linestyle=''), 'Sayed'),
+            (Line2D([], [], color='orange', marker='s', markersize=10, linestyle=''), 'Sadia'),
+            (enbs, 'eNBs'),
+        ]
         
         # Plot static buildings
-        for building in self.static_buildings:
-            rect = plt.Rectangle((building["x"], building["y"]), 
-                               building["w"], building["h"], 
+        for i in range(len(self.static_names)):
+            rect = plt.Rectangle((self.static_x[i], self.static_y[i]), 
+                               self.static_w[i], self.static_h[i], 
                                facecolor='gray', alpha=0.7, zorder=2)
             ax.add_patch(rect)
         
         # Plot initial positions of mobile buildings
-        for building in self.mobile_buildings:
-            x, y = self._get_building_position_at_time(building["name"], 0.0)
-            rect = plt.Rectangle((x, y), building["w"], building["h"], 
+        for i in range(len(self.mobile_names)):
+            x, y = self._mobile_track[i, 0]
+            rect = plt.Rectangle((x, y), self.mobile_w[i], self.mobile_h[i], 
                                facecolor='red', alpha=0.8, zorder=3)
             ax.add_patch(rect)
         
-        # Add connections (UEs to nearest eNB)
-        for i in range(len(self.ue_positions)):
-            ue_x, ue_y = self.ue_positions[i]
-            # Find nearest eNB
-            min_dist = float('inf')
-            nearest_enb = 0
-            for j, (enb_x, enb_y) in enumerate(self.enb_positions):
-                dist = np.sqrt((ue_x - enb_x)**2 + (ue_y - enb_y)**2)
-                if dist < min_dist:
-                    min_dist = dist
-                    nearest_enb = j
-            
-            enb_x, enb_y = self.enb_positions[nearest_enb]
-            ax.plot([ue_x, enb_x], [ue_y, enb_y], 
-                   'k--', alpha=0.3, linewidth=1)
+        # Add connections (UEs to nearest eNB); argmin of squared distance
+        nearest = np.argmin(((ue_xy[:, None] - enb_xy) ** 2).sum(-1), axis=1)
+        segments = np.stack([ue_xy, enb_xy[nearest]], axis=1)
+        ax.add_collection(LineCollection(segments, colors='k', linestyles='--',
+                                         alpha=0.3, linewidths=1))
         
         # Label special nodes
-        ax.annotate('Sayed', (self.ue_positions[0][0], self.ue_positions[0][1]), 
+        ax.annotate('Sayed', tuple(ue_xy[0]), 
                    xytext=(10, 10), textcoords='offset points', 
                    fontsize=10, fontweight='bold')
-        ax.annotate('Sadia', (self.ue_positions[-1][0], self.ue_positions[-1][1]), 
+        ax.annotate('Sadia', tuple(ue_xy[-1]), 
                    xytext=(10, 10), textcoords='offset points', 
                    fontsize=10, fontweight='bold')
         
@@ -371,15 +390,16 @@ class LTEAnimator:
         ax.set_xlabel('X Position (m)')
         ax.set_ylabel('Y Position (m)')
         ax.set_title('LTE Network Layout')
-        ax.legend()
+        ax.legend(*zip(*legend_handles))
         ax.grid(True, alpha=0.3)
         ax.set_aspect('equal')
         
-        plt.tight_layout()
+        fig.tight_layout()
+        os.makedirs(self.output_dir, exist_ok=True)
         output_file = os.path.join(self.output_dir, 'lte_static_layout.png')
-        plt.savefig(output_file, dpi=300, bbox_inches='tight')
+        fig.savefig(output_file, dpi=300, bbox_inches='tight')
         print(f"Static layout saved to {output_file}")
-        plt.show()
+        plt.close(fig)
 
 def main():
     """Main function"""
@@ -5,13 +5,46 @@ Analyzes the results from the WiFi mesh backhaul simulation.
 """
 
 import pandas as pd
+import matplotlib
 import matplotlib.pyplot as plt
+from matplotlib.collections import LineCollection
+from matplotlib.colors import to_rgba
+from matplotlib.lines import Line2D
 import numpy as np
+import csv
+import hashlib
 import os
+import pickle
 import sys
-import xml.etree.ElementTree as ET
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
+# Split long paths into chunks so Agg renders them in bounded pieces
+plt.rcParams['agg.path.chunksize'] = 10000
+
+# lxml's C parser is much faster on large FlowMonitor files; fall back to the stdlib
+try:
+    from lxml import etree as ET
+    HAVE_LXML = True
+except ImportError:
+    import xml.etree.ElementTree as ET
+    HAVE_LXML = False
+
+# Leading whitespace-separated fields of an ASCII trace line
+TRACE_COLUMNS = ['time', 'node_id', 'device_id', 'packet_type', 'packet_size',
+                 'flags', 'seq_num', 'src_addr', 'dst_addr', 'protocol']
+TRACE_NUMERIC_COLUMNS = ['time', 'node_id', 'device_id', 'packet_size']
+TRACE_CHUNK_LINES = 200_000
+
+# FlowStats/Flow attributes that are plain integer counters
+FLOW_INT_ATTRIBUTES = {'flowId', 'txBytes', 'rxBytes', 'txPackets', 'rxPackets',
+                       'lostPackets', 'timesForwarded'}
+
+# Part of the topology cache key; bump it whenever _build_base_figure draws
+# something different so stale cached backgrounds are rebuilt
+BASE_TOPOLOGY_LAYOUT_VERSION = 1
+
 class WiFiMeshBackhaulAnalyzer:
     def __init__(self, output_dir="wifi_mesh_backhaul_outputs"):
         self.output_dir = output_dir
@@ -27,86 +60,120 @@ class WiFiMeshBackhaulAnalyzer:
             13: "Sayed", 14: "Sadia"
         }
         
+        # Building positions
+        self.buildings = [
+            {"name": "leftBelow", "x": 0.0, "y": 96.0, "w": 60.0, "h": 8.0},
+            {"name": "rightBelow", "x": 340.0, "y": 96.0, "w": 60.0, "h": 8.0},
+            {"name": "leftAbove", "x": 0.0, "y": 296.0, "w": 60.0, "h": 8.0},
+            {"name": "rightAbove", "x": 340.0, "y": 296.0, "w": 60.0, "h": 8.0},
+            {"name": "cluster250a", "x": 80.0, "y": 220.0, "w": 60.0, "h": 8.0},
+            {"name": "cluster250b", "x": 170.0, "y": 220.0, "w": 80.0, "h": 8.0},
+            {"name": "cluster50", "x": 255.0, "y": 20.0, "w": 80.0, "h": 8.0},
+        ]
+        
         self.flowmon_file = os.path.join(output_dir, "flowmon-wifi-mesh-backhaul.xml")
         self.ascii_file = os.path.join(output_dir, "wifi_mesh_backhaul_ascii_traces_mesh.tr")
         self.ipv4_file = os.path.join(output_dir, "ipv4-l3.tr")
         
-    def analyze_flowmon_results(self):
-        """Analyze FlowMonitor XML results"""
+    def _iter_flow_elements(self, xml_file):
+        """Yield (parent, Flow element) pairs as each Flow element closes"""
+        if HAVE_LXML:
+            # lxml filters by tag in C and knows each element's parent
+            for _, elem in ET.iterparse(xml_file, events=('end',), tag='Flow'):
+                yield elem.getparent(), elem
+            return
+
+        stack = []
+        for event, elem in ET.iterparse(xml_file, events=('start', 'end')):
+            if event == 'start':
+                stack.append(elem)
+                continue
+            stack.pop()
+            if elem.tag == 'Flow' and stack:
+                yield stack[-1], elem
+
+    def analyze_flowmon_results(self, log=print):
+        """Analyze FlowMonitor XML results
+        
+        Returns (df, stats), where stats holds the protocol and success
+        counts plus an is_udp mask so the plots can reuse them. Progress
+        messages go to log, one string per call.
+        """
         if not os.path.exists(self.flowmon_file):
-            print(f"FlowMonitor file not found: {self.flowmon_file}")
-            return None
+            log(f"FlowMonitor file not found: {self.flowmon_file}")
+            return None, None
         
-        print("Analyzing FlowMonitor results...")
+        log("Analyzing FlowMonitor results...")
         
         try:
-            tree = ET.parse(self.flowmon_file)
-            root = tree.getroot()
-            
-            flows = []
-            # First, get protocol information from FlowClassifier
+            # Single streaming pass: Flow elements are handled as they close
+            # and cleared, so the histogram bins never pile up in memory.
+            # FlowStats comes before Ipv4FlowClassifier in the file, so the
+            # protocol is attached once the whole document has been read.
+            cols = defaultdict(list)  # one list per FlowStats attribute/child
+            n_stats = 0
             protocol_map = {}
-            for classifier in root.findall('.//Ipv4FlowClassifier'):
-                for flow in classifier.findall('Flow'):
-                    flow_id = flow.get('flowId')
-                    protocol_num = int(flow.get('protocol', 0))
+            for parent, elem in self._iter_flow_elements(self.flowmon_file):
+                if parent.tag == 'Ipv4FlowClassifier':
+                    flow_id = int(elem.get('flowId'))
+                    protocol_num = int(elem.get('protocol', 0))
                     if protocol_num == 17:  # UDP
                         protocol_map[flow_id] = 'UDP'
                     elif protocol_num == 6:  # TCP
                         protocol_map[flow_id] = 'TCP'
                     else:
                         protocol_map[flow_id] = f'Protocol_{protocol_num}'
+                elif parent.tag == 'FlowStats':
+                    # Attributes of the Flow element plus its child elements,
+                    # appended column-wise (None-padded if a key shows up late).
+                    # Counter attributes are typed here, once, as ints.
+                    fields = [(key, int(value) if key in FLOW_INT_ATTRIBUTES else value)
+                              for key, value in elem.attrib.items()]
+                    fields += [(child.tag, child.text) for child in elem]
+                    for key, value in fields:
+                        col = cols[key]
+                        if len(col) < n_stats:
+                            col.extend([None] * (n_stats - len(col)))
+                        col.append(value)
+                    n_stats += 1
+                else:
+                    continue
+
+                # Drop the finished Flow so the tree never accumulates
+                elem.clear()
+                parent.remove(elem)
+
+            for col in cols.values():
+                col.extend([None] * (n_stats - len(col)))
             
-            # Then process FlowStats and add protocol information
-            for flow in root.findall('.//FlowStats/Flow'):
-                flow_data = {}
-                # Get attributes directly from the Flow element
-                for attr_name, attr_value in flow.attrib.items():
-                    flow_data[attr_name] = attr_value
-                # Also get child elements if any
-                for child in flow:
-                    flow_data[child.tag] = child.text
-                
-                # Add protocol information from classifier
-                flow_id = flow_data.get('flowId')
-                protocol = protocol_map.get(flow_id, 'Unknown')
-                flow_data['protocol'] = protocol
-                
-                # Only include UDP and TCP flows
-                if protocol in ['UDP', 'TCP']:
-                    flows.append(flow_data)
-            
-            if not flows:
-                print("No flow data found in FlowMonitor results")
-                return None
+            # Add protocol information from classifier
+            cols['protocol'] = [protocol_map.get(flow_id, 'Unknown')
+                                for flow_id in cols.get('flowId', [None] * n_stats)]
             
-            # Create DataFrame
-            df = pd.DataFrame(flows)
+            # Create DataFrame straight from the columns; only UDP and TCP flows
+            df = pd.DataFrame(cols)
+            df = df[df['protocol'].isin(['UDP', 'TCP'])].reset_index(drop=True)
+            # Two distinct values: store as small integer codes, not strings
+            df['protocol'] = df['protocol'].astype('category')
             
-            # Convert numeric columns - handle nanosecond time format
-            def parse_ns_time(time_str):
-                if not time_str or time_str == '0' or time_str == '+0ns':
-                    return 0.0
-                # Remove 'ns' suffix and '+' prefix, then convert to seconds
-                if 'ns' in str(time_str):
-                    time_str = str(time_str).replace('ns', '').replace('+', '')
-                return float(time_str) / 1e9  # Convert nanoseconds to seconds
+            if df.empty:
+                log("No flow data found in FlowMonitor results")
+                return None, None
             
-            # Parse time columns with nanosecond handling
+            # Parse time columns with nanosecond handling: strip the '+' prefix
+            # and 'ns' suffix column-wise, then convert nanoseconds to seconds
             time_columns = ['timeFirstTxPacket', 'timeLastTxPacket', 'timeFirstRxPacket', 'timeLastRxPacket', 'delaySum']
             for col in time_columns:
                 if col in df.columns:
-                    df[col] = df[col].apply(parse_ns_time)
+                    ns = df[col].astype(str).str.replace('ns', '', regex=False).str.lstrip('+')
+                    df[col] = pd.to_numeric(ns, errors='coerce').fillna(0.0) / 1e9
             
-            # Convert other numeric columns normally
-            numeric_columns = ['jitterSum', 'lastDelay', 
-                             'txBytes', 'rxBytes', 'txPackets', 'rxPackets', 'lostPackets',
-                             'timesForwarded', 'delayHistogram', 'jitterHistogram', 
+            # Convert the remaining numeric columns (the counters are already ints)
+            numeric_columns = ['jitterSum', 'lastDelay', 'delayHistogram', 'jitterHistogram', 
                              'packetSizeHistogram', 'flowInterruptionsHistogram']
             
-            for col in numeric_columns:
-                if col in df.columns:
-                    df[col] = pd.to_numeric(df[col], errors='coerce')
+            present = [col for col in numeric_columns if col in df.columns]
+            df[present] = df[present].apply(pd.to_numeric, errors='coerce')
             
             # Calculate additional metrics
             # Handle cases where no packets were received (timeLastRxPacket = 0)
@@ -129,83 +196,150 @@ class WiFiMeshBackhaulAnalyzer:
                                      df['delaySum'] / df['rxPackets'],
                                      0)
             
-            print(f"Found {len(df)} flows (UDP and TCP only)")
+            log(f"Found {len(df)} flows (UDP and TCP only)")
             
-            # Print flow analysis summary
-            successful_flows = df[df['rxPackets'] > 0]
-            failed_flows = df[df['rxPackets'] == 0]
+            # Print flow analysis summary; each mask is computed once and
+            # counted with sum() rather than materialising filtered copies
+            fail_mask = df['rxPackets'] == 0
+            is_udp = (df['protocol'] == 'UDP').to_numpy()
+            stats = {
+                'n_udp': int(is_udp.sum()),
+                'n_tcp': int((df['protocol'] == 'TCP').sum()),
+                'n_ok': int((df['rxPackets'] > 0).sum()),
+                'n_fail': int(fail_mask.sum()),
+                'is_udp': is_udp,
+            }
             
             # Show protocol breakdown
-            udp_flows = df[df['protocol'] == 'UDP']
-            tcp_flows = df[df['protocol'] == 'TCP']
-            print(f"  - UDP flows: {len(udp_flows)}")
-            print(f"  - TCP flows: {len(tcp_flows)}")
-            print(f"  - Successful flows: {len(successful_flows)}")
-            print(f"  - Failed flows: {len(failed_flows)}")
+            log(f"  - UDP flows: {stats['n_udp']}")
+            log(f"  - TCP flows: {stats['n_tcp']}")
+            log(f"  - Successful flows: {stats['n_ok']}")
+            log(f"  - Failed flows: {stats['n_fail']}")
             
-            if len(failed_flows) > 0:
-                print("  - Failed flows analysis:")
-                for idx, flow in failed_flows.iterrows():
-                    protocol = flow.get('protocol', 'Unknown')
-                    print(f"    Flow {int(flow.get('flowId', idx))} ({protocol}): {int(flow['txPackets'])} packets sent, 0 received")
+            if stats['n_fail'] > 0:
+                log("  - Failed flows analysis:")
+                failed = df.loc[fail_mask]
+                msgs = ("    Flow " + failed['flowId'].astype(str)
+                        + " (" + failed['protocol'].astype(str) + "): "
+                        + failed['txPackets'].astype(int).astype(str) + " packets sent, 0 received")
+                log("\n".join(msgs))
             
-            return df
+            return df, stats
             
         except Exception as e:
-            print(f"Error analyzing FlowMonitor results: {e}")
-            return None
+            log(f"Error analyzing FlowMonitor results: {e}")
+            return None, None
     
-    def analyze_ascii_traces(self):
-        """Analyze ASCII trace files"""
+    def _coerce_trace_columns(self, df):
+        """Convert the numeric trace fields, dropping rows that do not parse"""
+        numeric = {col: pd.to_numeric(df[col], errors='coerce') for col in TRACE_NUMERIC_COLUMNS}
+        valid = np.ones(len(df), dtype=bool)
+        for col, values in numeric.items():
+            valid &= values.notna().to_numpy()
+            if col != 'time':
+                valid &= (values % 1 == 0).to_numpy()
+        df = df.assign(**numeric)[valid].reset_index(drop=True)
+        return df.astype({col: 'int64' for col in TRACE_NUMERIC_COLUMNS if col != 'time'})
+    
+    def analyze_ascii_traces(self, log=print):
+        """Analyze ASCII trace files; progress messages go to log"""
         if not os.path.exists(self.ascii_file):
-            print(f"ASCII trace file not found: {self.ascii_file}")
+            log(f"ASCII trace file not found: {self.ascii_file}")
             return None
         
-        print("Analyzing ASCII traces...")
+        log("Analyzing ASCII traces...")
         
         try:
-            # Read ASCII traces
-            with open(self.ascii_file, 'r') as f:
-                lines = f.readlines()
-            
-            trace_data = []
-            for line in lines:
-                if line.strip():
-                    parts = line.strip().split()
-                    if len(parts) >= 10:
-                        try:
-                            trace_data.append({
-                                'time': float(parts[0]),
-                                'node_id': int(parts[1]),
-                                'device_id': int(parts[2]),
-                                'packet_type': parts[3],
-                                'packet_size': int(parts[4]),
-                                'flags': parts[5],
-                                'seq_num': parts[6],
-                                'src_addr': parts[7],
-                                'dst_addr': parts[8],
-                                'protocol': parts[9] if len(parts) > 9 else 'unknown'
-                            })
-                        except (ValueError, IndexError):
-                            continue
+            # Tokenise with pandas' C parser; only the first ten fields are
+            # kept and lines with fewer fields come back padded with ''.
+            # The file is streamed in chunks so only one block of raw string
+            # fields is alive at a time.
+            chunks = []
+            with open(self.ascii_file, 'r', buffering=1 << 20) as f:
+                reader = pd.read_csv(f, sep=r'\s+', header=None, engine='c',
+                                     names=TRACE_COLUMNS, usecols=range(len(TRACE_COLUMNS)),
+                                     dtype=str, keep_default_na=False, quoting=csv.QUOTE_NONE,
+                                     on_bad_lines='skip', chunksize=TRACE_CHUNK_LINES)
+                for chunk in reader:
+                    chunks.append(self._coerce_trace_columns(chunk[chunk[TRACE_COLUMNS[-1]] != '']))
+            df = pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame(columns=TRACE_COLUMNS)
             
-            if not trace_data:
-                print("No valid trace data found")
+            if df.empty:
+                log("No valid trace data found")
                 return None
             
-            df = pd.DataFrame(trace_data)
-            print(f"Found {len(df)} trace entries")
+            log(f"Found {len(df)} trace entries")
             return df
             
         except Exception as e:
-            print(f"Error analyzing ASCII traces: {e}")
+            log(f"Error analyzing ASCII traces: {e}")
             return None
     
+    def _base_topology_key(self):
+        """Hash of everything drawn into the static topology background"""
+        # Pickled figures are tied to the matplotlib that wrote them
+        params = repr((BASE_TOPOLOGY_LAYOUT_VERSION, matplotlib.__version__,
+                       self.buildings, self.field_size, self.n_total_nodes, self.sim_time))
+        return hashlib.blake2b(params.encode(), digest_size=6).hexdigest()
+    
+    def _build_base_figure(self):
+        """Return (fig, ax) with the static topology layout, reusing a pickled copy"""
+        cache_file = os.path.join(self.output_dir, ".base_topology.pkl")
+        key = self._base_topology_key()
+        if os.path.exists(cache_file):
+            try:
+                with open(cache_file, 'rb') as f:
+                    cached_key, fig = pickle.load(f)
+                if cached_key == key:
+                    return fig, fig.axes[0]
+                plt.close(fig)
+            except Exception as e:
+                print(f"Ignoring unreadable topology cache {cache_file}: {e}")
+        
+        fig, ax = plt.subplots(figsize=(14, 12))
+        
+        # Draw buildings
+        for building in self.buildings:
+            rect = plt.Rectangle((building["x"], building["y"]), 
+                               building["w"], building["h"],
+                               facecolor='#8B4513', alpha=0.8,  # Dark brown color
+                               edgecolor='black', linewidth=1)
+            ax.add_patch(rect)
+        
+        ax.set_xlim(-20, 420)
+        ax.set_ylim(-20, 500)  # Extra space for internet server
+        ax.set_aspect('equal')
+        ax.grid(True, alpha=0.3)
+        ax.set_title('WiFi Mesh Backhaul Network Topology', fontsize=16, weight='bold')
+        ax.set_xlabel('X Position (meters)', fontsize=12)
+        ax.set_ylabel('Y Position (meters)', fontsize=12)
+        
+        # Add statistics
+        stats_text = f"Network Statistics:\n" \
+                    f"• Total Nodes: {self.n_total_nodes}\n" \
+                    f"• Backhaul Gateway: 1\n" \
+                    f"• Mesh Hop Nodes: 4\n" \
+                    f"• STA Nodes: 8\n" \
+                    f"• Special Nodes: Sayed, Sadia\n" \
+                    f"• Simulation Time: {self.sim_time}s"
+        # zorder 4 keeps the box above the node labels drawn later
+        ax.text(0.02, 0.98, stats_text, transform=ax.transAxes, 
+               fontsize=11, verticalalignment='top', zorder=4,
+               bbox=dict(boxstyle='round', facecolor='white', alpha=0.9))
+        
+        try:
+            with open(cache_file, 'wb') as f:
+                pickle.dump((key, fig), f)
+        except OSError as e:
+            print(f"Could not cache topology background: {e}")
+        return fig, ax
+    
     def plot_network_topology(self):
         """Create network topology visualization"""
         print("Creating network topology plot...")
         
-        fig, ax = plt.subplots(figsize=(14, 12))
+        # Buildings, axes and the statistics box come from the cached base
+        fig, ax = self._build_base_figure()
         
         # Node positions (matching exact coordinates from C++ code)
         node_positions = {
@@ -226,60 +360,54 @@ class WiFiMeshBackhaulAnalyzer:
             14: (400.0, 400.0) # Sadia
         }
         
-        # Building positions
-        buildings = [
-            {"name": "leftBelow", "x": 0.0, "y": 96.0, "w": 60.0, "h": 8.0},
-            {"name": "rightBelow", "x": 340.0, "y": 96.0, "w": 60.0, "h": 8.0},
-            {"name": "leftAbove", "x": 0.0, "y": 296.0, "w": 60.0, "h": 8.0},
-            {"name": "rightAbove", "x": 340.0, "y": 296.0, "w": 60.0, "h": 8.0},
-            {"name": "cluster250a", "x": 80.0, "y": 220.0, "w": 60.0, "h": 8.0},
-            {"name": "cluster250b", "x": 170.0, "y": 220.0, "w": 80.0, "h": 8.0},
-            {"name": "cluster50", "x": 255.0, "y": 20.0, "w": 80.0, "h": 8.0},
-        ]
-        
-        # Draw buildings
-        for building in buildings:
-            rect = plt.Rectangle((building["x"], building["y"]), 
-                               building["w"], building["h"],
-                               facecolor='#8B4513', alpha=0.8,  # Dark brown color
-                               edgecolor='black', linewidth=1)
-            ax.add_patch(rect)
-        
-        # Draw network connections
+        # Draw network connections as one LineCollection, one segment per link
+        internet_pos = (30.0, self.field_size + 50)  # Outside the 400x400 field
+        segments = []
+        link_styles = []
         # Backhaul connection to first mesh node only (Mesh0) - RED
-        backhaul_pos = node_positions[0]
-        mesh0_pos = node_positions[1]  # Mesh0 is node 1
-        ax.plot([backhaul_pos[0], mesh0_pos[0]], [backhaul_pos[1], mesh0_pos[1]], 
-               'r-', alpha=0.8, linewidth=4, label='Backhaul Link')
+        segments.append([node_positions[0], node_positions[1]])
+        link_styles.append(('Backhaul Link', 'red', 0.8, 4, '-'))
         
         # Mesh hop chain connections (Mesh0 -> Mesh1 -> Mesh2 -> Mesh3)
         for i in range(1, 4):
-            pos1 = node_positions[i]
-            pos2 = node_positions[i + 1]
-            ax.plot([pos1[0], pos2[0]], [pos1[1], pos2[1]], 
-                   'r-', alpha=0.7, linewidth=2, label='Mesh Chain' if i == 1 else "")
+            segments.append([node_positions[i], node_positions[i + 1]])
+            link_styles.append(('Mesh Chain', 'red', 0.7, 2, '-'))
         
         # STA to mesh connections
         for i in range(5, 13):
-            sta_pos = node_positions[i]
             mesh_idx = ((i - 5) // 2) + 1
-            mesh_pos = node_positions[mesh_idx]
-            ax.plot([sta_pos[0], mesh_pos[0]], [sta_pos[1], mesh_pos[1]], 
-                   'g--', alpha=0.3, linewidth=1, label='STA Links' if i == 5 else "")
+            segments.append([node_positions[i], node_positions[mesh_idx]])
+            link_styles.append(('STA Links', 'green', 0.3, 1, '--'))
         
-        # Note: Sayed and Sadia communicate through the mesh network, no direct link
+        # Connection from internet server to backhaul
+        segments.append([internet_pos, node_positions[0]])
+        link_styles.append(('Internet Link', 'green', 0.8, 3, '--'))
         
-        # Draw nodes
-        colors = ['blue', 'red', 'red', 'red', 'red', 'yellow', 'yellow', 'yellow', 'yellow',
-                 'yellow', 'yellow', 'yellow', 'yellow', 'cyan', 'orange']
-        markers = ['^', 's', 's', 's', 's', 'o', 'o', 'o', 'o', 'o', 'o', 'o', 'o', 'D', 'D']
-        sizes = [200, 150, 150, 150, 150, 100, 100, 100, 100, 100, 100, 100, 100, 180, 180]
+        # Note: Sayed and Sadia communicate through the mesh network, no direct link
         
-        for i, (pos, color, marker, size) in enumerate(zip(node_positions.values(), colors, markers, sizes)):
-            ax.scatter(pos[0], pos[1], c=color, s=size, marker=marker, 
+        _, link_colors, alphas, widths, styles = zip(*link_styles)
+        # zorder 2 keeps the links above the node markers, as Line2D did
+        ax.add_collection(LineCollection(segments, colors=[to_rgba(c, a) for c, a in zip(link_colors, alphas)],
+                                         linewidths=widths, linestyles=styles, zorder=2))
+        link_handles = {}
+        for label, color, alpha, width, style in link_styles:
+            link_handles.setdefault(label, Line2D([], [], color=color, alpha=alpha,
+                                                  linewidth=width, linestyle=style))
+        
+        # Draw nodes, one scatter per marker shape
+        xy = np.array(list(node_positions.values()))
+        colors = np.array(['blue', 'red', 'red', 'red', 'red', 'yellow', 'yellow', 'yellow', 'yellow',
+                           'yellow', 'yellow', 'yellow', 'yellow', 'cyan', 'orange'])
+        markers = np.array(['^', 's', 's', 's', 's', 'o', 'o', 'o', 'o', 'o', 'o', 'o', 'o', 'D', 'D'])
+        sizes = np.array([200, 150, 150, 150, 150, 100, 100, 100, 100, 100, 100, 100, 100, 180, 180])
+        
+        for marker in dict.fromkeys(markers):
+            idx = markers == marker
+            ax.scatter(xy[idx, 0], xy[idx, 1], c=colors[idx], s=sizes[idx], marker=marker,
                       edgecolors='black', linewidth=2)
-            
-            # Add labels
+        
+        # Add labels
+        for i, pos in enumerate(node_positions.values()):
             if i == 0:
                 ax.annotate('Backhaul\nGateway', pos, xytext=(10, 10), 
                            textcoords='offset points', fontsize=10, weight='bold')
@@ -297,47 +425,33 @@ class WiFiMeshBackhaulAnalyzer:
                            textcoords='offset points', fontsize=10, weight='bold')
         
         # Add internet server (outside the playground)
-        internet_pos = (30.0, self.field_size + 50)  # Outside the 400x400 field
-        ax.scatter(internet_pos[0], internet_pos[1], c='green', s=120, marker='*', 
-                  edgecolors='black', linewidth=2, label='Internet Server')
+        server = ax.scatter(internet_pos[0], internet_pos[1], c='green', s=120, marker='*', 
+                           edgecolors='black', linewidth=2)
         ax.annotate('Internet\nServer', internet_pos, xytext=(10, 10), 
                    textcoords='offset points', fontsize=10, weight='bold')
         
-        # Draw connection from internet server to backhaul
-        backhaul_pos = node_positions[0]
-        ax.plot([internet_pos[0], backhaul_pos[0]], [internet_pos[1], backhaul_pos[1]], 
-               'g--', alpha=0.8, linewidth=3, label='Internet Link')
-        
-        ax.set_xlim(-20, 420)
-        ax.set_ylim(-20, 500)  # Extra space for internet server
-        ax.set_aspect('equal')
-        ax.grid(True, alpha=0.3)
-        ax.set_title('WiFi Mesh Backhaul Network Topology', fontsize=16, weight='bold')
-        ax.set_xlabel('X Position (meters)', fontsize=12)
-        ax.set_ylabel('Y Position (meters)', fontsize=12)
-        
         # Add legend
-        ax.legend(loc='upper right', fontsize=10)
-        
-        # Add statistics
-        stats_text = f"Network Statistics:\n" \
-                    f"• Total Nodes: {self.n_total_nodes}\n" \
-                    f"• Backhaul Gateway: 1\n" \
-                    f"• Mesh Hop Nodes: 4\n" \
-                    f"• STA Nodes: 8\n" \
-                    f"• Special Nodes: Sayed, Sadia\n" \
-                    f"• Simulation Time: {self.sim_time}s"
-        ax.text(0.02, 0.98, stats_text, transform=ax.transAxes, 
-               fontsize=11, verticalalignment='top',
-               bbox=dict(boxstyle='round', facecolor='white', alpha=0.9))
-        
-        plt.tight_layout()
+        legend_items = list(link_handles.items())
+        legend_items.insert(3, ('Internet Server', server))
+        labels, handles = zip(*legend_items)
+        ax.legend(handles, labels, loc='upper right', fontsize=10)
+        
+        fig.tight_layout()
+        # The topology is a line diagram, so the SVG is the full-quality copy;
+        # the PNG is a lighter 150 dpi raster for the HTML report
         output_file = os.path.join(self.output_dir, "network_topology_analysis.png")
-        plt.savefig(output_file, dpi=300, bbox_inches='tight')
-        print(f"Network topology plot saved: {output_file}")
-        plt.close()
+        svg_file = os.path.join(self.output_dir, "network_topology_analysis.svg")
+        fig.savefig(svg_file, bbox_inches='tight')
+        fig.savefig(output_file, dpi=150, bbox_inches='tight')
+        print(f"Network topology plot saved: {output_file} (vector: {svg_file})")
+        plt.close(fig)
     
-    def plot_flow_analysis(self, flow_df):
+    def _hist_panel(self, ax, values, color, bins=20):
+        """Bin values with np.histogram and draw the counts as filled stairs"""
+        counts, edges = np.histogram(values.to_numpy(), bins=bins)
+        ax.stairs(counts, edges, fill=True, alpha=0.7, color=color)
+    
+    def plot_flow_analysis(self, flow_df, flow_stats):
         """Plot flow analysis results"""
         if flow_df is None or flow_df.empty:
             print("No flow data available for analysis")
@@ -348,11 +462,15 @@ class WiFiMeshBackhaulAnalyzer:
         fig, axes = plt.subplots(2, 3, figsize=(18, 12))
         fig.suptitle('WiFi Mesh Backhaul Network - Flow Analysis', fontsize=16, weight='bold')
         
+        # Successful flows are only sliced out when there are any
+        ok_mask = (flow_df['throughput'] > 0).to_numpy()
+        successful_count = int(ok_mask.sum())
+        successful_flows = flow_df.loc[ok_mask] if successful_count else None
+        
         # Throughput distribution (only successful flows)
-        successful_flows = flow_df[flow_df['throughput'] > 0]
-        if not successful_flows.empty:
-            axes[0, 0].hist(successful_flows['throughput'], bins=20, alpha=0.7, color='blue')
-            axes[0, 0].set_title(f'Throughput Distribution\n({len(successful_flows)} successful flows)')
+        if successful_flows is not None:
+            self._hist_panel(axes[0, 0], successful_flows['throughput'], 'blue')
+            axes[0, 0].set_title(f'Throughput Distribution\n({successful_count} successful flows)')
         else:
             axes[0, 0].text(0.5, 0.5, 'No successful flows', ha='center', va='center', transform=axes[0, 0].transAxes)
             axes[0, 0].set_title('Throughput Distribution\n(No successful flows)')
@@ -361,9 +479,9 @@ class WiFiMeshBackhaulAnalyzer:
         axes[0, 0].grid(True, alpha=0.3)
         
         # Delay distribution (only successful flows)
-        if not successful_flows.empty:
-            axes[0, 1].hist(successful_flows['avg_delay'].dropna(), bins=20, alpha=0.7, color='green')
-            axes[0, 1].set_title(f'Average Delay Distribution\n({len(successful_flows)} successful flows)')
+        if successful_flows is not None:
+            self._hist_panel(axes[0, 1], successful_flows['avg_delay'].dropna(), 'green')
+            axes[0, 1].set_title(f'Average Delay Distribution\n({successful_count} successful flows)')
         else:
             axes[0, 1].text(0.5, 0.5, 'No successful flows', ha='center', va='center', transform=axes[0, 1].transAxes)
             axes[0, 1].set_title('Average Delay Distribution\n(No successful flows)')
@@ -372,23 +490,23 @@ class WiFiMeshBackhaulAnalyzer:
         axes[0, 1].grid(True, alpha=0.3)
         
         # Packet loss rate
-        axes[0, 2].hist(flow_df['packet_loss_rate'].dropna(), bins=20, alpha=0.7, color='red')
+        self._hist_panel(axes[0, 2], flow_df['packet_loss_rate'].dropna(), 'red')
         axes[0, 2].set_title('Packet Loss Rate Distribution')
         axes[0, 2].set_xlabel('Packet Loss Rate')
         axes[0, 2].set_ylabel('Number of Flows')
         axes[0, 2].grid(True, alpha=0.3)
         
         # Flow duration
-        axes[1, 0].hist(flow_df['duration'].dropna(), bins=20, alpha=0.7, color='orange')
+        self._hist_panel(axes[1, 0], flow_df['duration'].dropna(), 'orange')
         axes[1, 0].set_title('Flow Duration Distribution')
         axes[1, 0].set_xlabel('Duration (seconds)')
         axes[1, 0].set_ylabel('Number of Flows')
         axes[1, 0].grid(True, alpha=0.3)
         
         # Throughput vs Delay scatter plot (only successful flows)
-        if not successful_flows.empty:
-            axes[1, 1].scatter(successful_flows['throughput'], successful_flows['avg_delay'], alpha=0.6, color='purple')
-            axes[1, 1].set_title(f'Throughput vs Average Delay\n({len(successful_flows)} successful flows)')
+        if successful_flows is not None:
+            axes[1, 1].scatter(successful_flows['throughput'].to_numpy(), successful_flows['avg_delay'].to_numpy(), alpha=0.6, color='purple')
+            axes[1, 1].set_title(f'Throughput vs Average Delay\n({successful_count} successful flows)')
         else:
             axes[1, 1].text(0.5, 0.5, 'No successful flows', ha='center', va='center', transform=axes[1, 1].transAxes)
             axes[1, 1].set_title('Throughput vs Average Delay\n(No successful flows)')
@@ -397,8 +515,8 @@ class WiFiMeshBackhaulAnalyzer:
         axes[1, 1].grid(True, alpha=0.3)
         
         # Traffic volume by flow with protocol colors
-        colors = ['blue' if protocol == 'UDP' else 'red' for protocol in flow_df['protocol']]
-        axes[1, 2].bar(range(len(flow_df)), flow_df['rxBytes'], alpha=0.7, color=colors)
+        colors = np.where(flow_stats['is_udp'], 'blue', 'red')
+        axes[1, 2].bar(np.arange(len(flow_df)), flow_df['rxBytes'].to_numpy(), alpha=0.7, color=colors)
         axes[1, 2].set_title('Traffic Volume by Flow (Blue=UDP, Red=TCP)')
         axes[1, 2].set_xlabel('Flow ID')
         axes[1, 2].set_ylabel('Received Bytes')
@@ -406,10 +524,9 @@ class WiFiMeshBackhaulAnalyzer:
         
         # Add summary statistics text box
         total_flows = len(flow_df)
-        successful_count = len(successful_flows)
         failed_count = total_flows - successful_count
-        udp_flows = len(flow_df[flow_df['protocol'] == 'UDP'])
-        tcp_flows = len(flow_df[flow_df['protocol'] == 'TCP'])
+        udp_flows = flow_stats['n_udp']
+        tcp_flows = flow_stats['n_tcp']
         
         summary_text = f"Flow Statistics Summary (UDP & TCP only):\n" \
                       f"• Total Flows: {total_flows}\n" \
@@ -424,7 +541,7 @@ class WiFiMeshBackhaulAnalyzer:
         
         plt.tight_layout()
         output_file = os.path.join(self.output_dir, "flow_analysis.png")
-        plt.savefig(output_file, dpi=300, bbox_inches='tight')
+        plt.savefig(output_file, dpi=150, bbox_inches='tight')
         print(f"Flow analysis plot saved: {output_file}")
         plt.close()
     
@@ -434,7 +551,8 @@ class WiFiMeshBackhaulAnalyzer:
         
         report_file = os.path.join(self.output_dir, "wifi_mesh_backhaul_analysis_report.html")
         
-        html_content = f"""
+        parts = []
+        parts.append(f"""
         <!DOCTYPE html>
         <html>
         <head>
@@ -471,17 +589,29 @@ class WiFiMeshBackhaulAnalyzer:
                 </ul>
                 <p><strong>Network Architecture:</strong> The backhaul is connected only to Mesh0, which then forms a chain with the other mesh nodes. STA nodes connect to the nearest mesh hop, and all traffic flows through this mesh backbone to reach the internet.</p>
             </div>
-        """
+        """)
         
         if flow_df is not None and not flow_df.empty:
-            # Calculate key metrics
+            # Calculate key metrics in a single aggregation pass
             total_flows = len(flow_df)
-            avg_throughput = flow_df['throughput'].mean()
-            avg_delay = flow_df['avg_delay'].mean()
-            avg_packet_loss = flow_df['packet_loss_rate'].mean()
-            total_bytes = flow_df['rxBytes'].sum()
+            stats = flow_df.agg({'throughput': ['mean', 'max', 'min'],
+                                 'avg_delay': ['mean', 'max', 'min'],
+                                 'packet_loss_rate': ['mean', 'max'],
+                                 'rxBytes': ['sum'], 'txPackets': ['sum'], 'rxPackets': ['sum']})
+            avg_throughput = stats.loc['mean', 'throughput']
+            max_throughput = stats.loc['max', 'throughput']
+            min_throughput = stats.loc['min', 'throughput']
+            avg_delay = stats.loc['mean', 'avg_delay']
+            max_delay = stats.loc['max', 'avg_delay']
+            min_delay = stats.loc['min', 'avg_delay']
+            avg_packet_loss = stats.loc['mean', 'packet_loss_rate']
+            max_packet_loss = stats.loc['max', 'packet_loss_rate']
+            # The sum row shares columns with NaN cells, so cast counts back to int
+            total_bytes = int(stats.loc['sum', 'rxBytes'])
+            total_tx_packets = int(stats.loc['sum', 'txPackets'])
+            total_rx_packets = int(stats.loc['sum', 'rxPackets'])
             
-            html_content += f"""
+            parts.append(f"""
             <div class="metrics">
                 <div class="metric">
                     <h3>Total Flows</h3>
@@ -514,20 +644,20 @@ class WiFiMeshBackhaulAnalyzer:
                 <tr><th>Metric</th><th>Value</th></tr>
                 <tr><td>Total Flows</td><td>{total_flows}</td></tr>
                 <tr><td>Average Throughput</td><td>{avg_throughput:.3f} Mbps</td></tr>
-                <tr><td>Max Throughput</td><td>{flow_df['throughput'].max():.3f} Mbps</td></tr>
-                <tr><td>Min Throughput</td><td>{flow_df['throughput'].min():.3f} Mbps</td></tr>
+                <tr><td>Max Throughput</td><td>{max_throughput:.3f} Mbps</td></tr>
+                <tr><td>Min Throughput</td><td>{min_throughput:.3f} Mbps</td></tr>
                 <tr><td>Average Delay</td><td>{avg_delay:.6f} seconds</td></tr>
-                <tr><td>Max Delay</td><td>{flow_df['avg_delay'].max():.6f} seconds</td></tr>
-                <tr><td>Min Delay</td><td>{flow_df['avg_delay'].min():.6f} seconds</td></tr>
+                <tr><td>Max Delay</td><td>{max_delay:.6f} seconds</td></tr>
+                <tr><td>Min Delay</td><td>{min_delay:.6f} seconds</td></tr>
                 <tr><td>Average Packet Loss</td><td>{avg_packet_loss:.2%}</td></tr>
-                <tr><td>Max Packet Loss</td><td>{flow_df['packet_loss_rate'].max():.2%}</td></tr>
+                <tr><td>Max Packet Loss</td><td>{max_packet_loss:.2%}</td></tr>
                 <tr><td>Total Bytes Transferred</td><td>{total_bytes / 1024 / 1024:.2f} MB</td></tr>
-                <tr><td>Total Packets Transmitted</td><td>{flow_df['txPackets'].sum()}</td></tr>
-                <tr><td>Total Packets Received</td><td>{flow_df['rxPackets'].sum()}</td></tr>
+                <tr><td>Total Packets Transmitted</td><td>{total_tx_packets}</td></tr>
+                <tr><td>Total Packets Received</td><td>{total_rx_packets}</td></tr>
             </table>
-            """
+            """)
         
-        html_content += f"""
+        parts.append(f"""
             <h2>Network Topology</h2>
             <img src="network_topology_analysis.png" alt="Network Topology">
             
@@ -558,7 +688,7 @@ class WiFiMeshBackhaulAnalyzer:
             <ul>
                 <li>wifi_mesh_backhaul_animation.gif - Network animation</li>
                 <li>wifi_mesh_backhaul_topology.png - Static topology overview</li>
-                <li>network_topology_analysis.png - Topology analysis</li>
+                <li>network_topology_analysis.png / .svg - Topology analysis</li>
                 <li>flow_analysis.png - Flow performance analysis</li>
                 <li>flowmon-wifi-mesh-backhaul.xml - FlowMonitor results</li>
                 <li>wifi_mesh_backhaul_ascii_traces_mesh.tr - Detailed traces</li>
@@ -566,10 +696,10 @@ class WiFiMeshBackhaulAnalyzer:
             </ul>
         </body>
         </html>
-        """
+        """)
         
         with open(report_file, 'w') as f:
-            f.write(html_content)
+            f.write("".join(parts))
         
         print(f"Analysis report saved: {report_file}")
     
@@ -582,16 +712,23 @@ class WiFiMeshBackhaulAnalyzer:
             print(f"Error: Output directory '{self.output_dir}' not found!")
             return
         
-        # Analyze FlowMonitor results
-        flow_df = self.analyze_flowmon_results()
-        
-        # Analyze ASCII traces
-        trace_df = self.analyze_ascii_traces()
+        # The FlowMonitor XML and the ASCII traces are independent files, so
+        # parse them side by side (both parsers spend most time in C code).
+        # Each parser collects its messages, printed once both are done so
+        # the two reports do not interleave.
+        flowmon_log, trace_log = [], []
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            flowmon_future = executor.submit(self.analyze_flowmon_results, log=flowmon_log.append)
+            trace_future = executor.submit(self.analyze_ascii_traces, log=trace_log.append)
+            flow_df, flow_stats = flowmon_future.result()
+            trace_df = trace_future.result()
+        for message in flowmon_log + trace_log:
+            print(message)
         
         # Create plots
         self.plot_network_topology()
         if flow_df is not None and not flow_df.empty:
-            self.plot_flow_analysis(flow_df)
+            self.plot_flow_analysis(flow_df, flow_stats)
         
         # Generate report
         self.generate_report(flow_df, trace_df)
@@ -600,6 +737,7 @@ class WiFiMeshBackhaulAnalyzer:
         print(f"Results saved in: {self.output_dir}/")
         print("- wifi_mesh_backhaul_analysis_report.html")
         print("- network_topology_analysis.png")
+        print("- network_topology_analysis.svg")
         if flow_df is not None and not flow_df.empty:
             print("- flow_analysis.png")
 
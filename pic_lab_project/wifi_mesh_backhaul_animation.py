@@ -6,11 +6,41 @@ Creates an animated visualization of the WiFi mesh backhaul simulation with movi
 
 import matplotlib.pyplot as plt
 import matplotlib.animation as animation
+from matplotlib.collections import LineCollection
+from matplotlib.colors import to_rgba
+from matplotlib.lines import Line2D
+from matplotlib.transforms import offset_copy
 import numpy as np
 import os
+import subprocess
 import sys
 from datetime import datetime
 
+class BlitManager:
+    """Redraw only the animated artists on top of a cached canvas background"""
+    
+    def __init__(self, fig, animated_artists):
+        self.fig = fig
+        self.canvas = fig.canvas
+        # Animated artists are drawn after the background, so keep their
+        # relative stacking order
+        self.artists = sorted(animated_artists, key=lambda a: a.get_zorder())
+        for artist in self.artists:
+            artist.set_animated(True)
+        self.background = None
+    
+    def capture_background(self):
+        """Render everything that is not animated once and keep the pixels"""
+        self.canvas.draw()
+        self.background = self.canvas.copy_from_bbox(self.fig.bbox)
+    
+    def update(self):
+        """Restore the background and draw the animated artists over it"""
+        self.canvas.restore_region(self.background)
+        for artist in self.artists:
+            self.fig.draw_artist(artist)
+        self.canvas.blit(self.fig.bbox)
+
 class WiFiMeshBackhaulAnimator:
     def __init__(self, output_dir="wifi_mesh_backhaul_outputs"):
         self.output_dir = output_dir
@@ -56,18 +86,39 @@ class WiFiMeshBackhaulAnimator:
         self.fps = 2  # frames per second
         self.total_frames = int(self.duration * self.fps)
         
+        # Per-frame building positions, computed once
+        self._static_building_list = [dict(building, height=10.0)  # Default height
+                                      for building in self.static_buildings]
+        self._mobile_tracks = self._build_mobile_tracks()
+        
         # Node movement simulation (RandomWalk2d parameters from C++ code)
         self.node_speed = 50.0  # m/s (from C++ code)
         self.node_bounds = (0, 400, 0, 400)  # Rectangle bounds
         self.node_time_step = 1.0  # seconds (from C++ code)
         
         # Node trails for movement visualization
-        self.node_trails = [[] for _ in range(self.n_total_nodes)]
+        self.trail_length = 20
+        self._rng = np.random.default_rng(42)  # Reproducible trajectories
+        
+        # STA positions for every frame, walked once up front
+        self._sta_track = self._build_sta_track()
         
         # Node types and colors
         self.node_types = self._define_node_types()
         self.node_colors = self._define_node_colors()
         
+        # Node indices grouped by type; each group is drawn as one scatter
+        sayed = 5 + self.n_total_stas
+        self._node_groups = {
+            "backhaul": np.array([0]),
+            "mesh": np.arange(1, 1 + self.n_mesh_hops),
+            "sta": np.arange(5, 5 + self.n_total_stas),
+            "sayed": np.array([sayed]),
+            "sadia": np.array([sayed + 1]),
+        }
+        # Mesh node each STA is attached to
+        self._sta_mesh = 1 + np.arange(self.n_total_stas) // self.n_sta_per_mesh
+        
     def _generate_node_positions(self):
         """Generate node positions matching C++ code layout"""
         positions = []
@@ -115,7 +166,7 @@ class WiFiMeshBackhaulAnimator:
         positions.append((0.0, 0.0))  # Sayed
         positions.append((self.field_size, self.field_size))  # Sadia
         
-        return positions
+        return np.asarray(positions, dtype=np.float64)
     
     def _define_node_types(self):
         """Define node types for visualization"""
@@ -163,77 +214,56 @@ class WiFiMeshBackhaulAnimator:
         }
         return movements
     
-    def _simulate_node_movement(self, time):
-        """Simulate node movement based on RandomWalk2d parameters"""
-        # Only STA nodes (nodes 5-12) are mobile
-        for i in range(5, 13):  # STA nodes
-            if i < len(self.node_positions):
-                # Simple random walk simulation
-                step_size = self.node_speed * (1.0 / self.fps)  # Distance per frame
-                angle = np.random.uniform(0, 2 * np.pi)
-                
-                dx = step_size * np.cos(angle)
-                dy = step_size * np.sin(angle)
-                
-                new_x = self.node_positions[i][0] + dx
-                new_y = self.node_positions[i][1] + dy
-                
-                # Keep within bounds
-                new_x = max(0, min(self.field_size, new_x))
-                new_y = max(0, min(self.field_size, new_y))
-                
-                self.node_positions[i] = (new_x, new_y)
-                
-                # Add to trail
-                self.node_trails[i].append((new_x, new_y))
-                
-                # Limit trail length
-                if len(self.node_trails[i]) > 20:
-                    self.node_trails[i].pop(0)
+    def _build_sta_track(self):
+        """Simulate node movement based on RandomWalk2d parameters for all frames"""
+        # Only STA nodes (nodes 5-12) are mobile; draw every heading at once
+        angles = self._rng.uniform(0, 2 * np.pi, size=(self.total_frames, self.n_total_stas))
+        step_size = self.node_speed * (1.0 / self.fps)  # Distance per frame
+        
+        # Build the walk in one (frames, stas, 2) buffer without temporaries
+        track = np.empty(angles.shape + (2,))
+        np.cos(angles, out=track[..., 0])
+        np.sin(angles, out=track[..., 1])
+        track *= step_size
+        np.cumsum(track, axis=0, out=track)
+        track += self.initial_node_positions[5:5 + self.n_total_stas]
+        
+        # Keep within bounds
+        np.clip(track, 0, self.field_size, out=track)
+        return track
     
-    def _get_building_positions(self, time):
-        """Get building positions at given time"""
-        buildings = []
-        
-        # Static buildings
-        for building in self.static_buildings:
-            buildings.append({
-                "name": building["name"],
-                "x": building["x"],
-                "y": building["y"],
-                "w": building["w"],
-                "h": building["h"],
-                "height": 10.0  # Default height
-            })
+    def _simulate_node_movement(self, frame):
+        """Move the STA nodes to their precomputed positions for this frame"""
+        self.node_positions[5:5 + self.n_total_stas] = self._sta_track[frame]
+    
+    def _trail(self, frame):
+        """Last trail_length positions of every STA up to frame, oldest first"""
+        return self._sta_track[max(0, frame + 1 - self.trail_length):frame + 1]
+    
+    def _build_mobile_tracks(self):
+        """Interpolate every mobile building's keyframes onto the frame grid"""
+        frame_times = np.arange(self.total_frames) / self.fps
+        tracks = {}
+        for name, movements in self.building_movements.items():
+            ts = np.array([m["time"] for m in movements])
+            xs = np.array([m["x"] for m in movements])
+            ys = np.array([m["y"] for m in movements])
+            # np.interp holds the last keyframe once the schedule runs out
+            tracks[name] = np.column_stack([np.interp(frame_times, ts, xs),
+                                            np.interp(frame_times, ts, ys)])
+        return tracks
+    
+    def _get_building_positions(self, frame):
+        """Get building positions at given frame index"""
+        buildings = list(self._static_building_list)
         
         # Mobile buildings
         for building in self.mobile_buildings:
-            movements = self.building_movements[building["name"]]
-            current_pos = movements[0]  # Default to first position
-            
-            # Find current position based on time
-            for i, movement in enumerate(movements):
-                if time >= movement["time"]:
-                    if i + 1 < len(movements):
-                        # Interpolate between current and next position
-                        next_movement = movements[i + 1]
-                        if time < next_movement["time"]:
-                            # Linear interpolation
-                            t_ratio = (time - movement["time"]) / (next_movement["time"] - movement["time"])
-                            x = movement["x"] + t_ratio * (next_movement["x"] - movement["x"])
-                            y = movement["y"] + t_ratio * (next_movement["y"] - movement["y"])
-                            current_pos = {"x": x, "y": y}
-                        else:
-                            current_pos = movement
-                    else:
-                        current_pos = movement
-                else:
-                    break
-            
+            x, y = self._mobile_tracks[building["name"]][frame]
             buildings.append({
                 "name": building["name"],
-                "x": current_pos["x"],
-                "y": current_pos["y"],
+                "x": x,
+                "y": y,
                 "w": building["w"],
                 "h": building["h"],
                 "height": self.building_heights[building["name"]]
@@ -243,247 +273,275 @@ class WiFiMeshBackhaulAnimator:
     
     def _draw_network_connections(self, ax):
         """Draw network connections"""
-        # Draw backhaul connection to first mesh node only (Mesh0) - RED
-        backhaul_pos = self.node_positions[0]
-        mesh0_pos = self.node_positions[1]  # Mesh0 is node 1
-        ax.plot([backhaul_pos[0], mesh0_pos[0]], [backhaul_pos[1], mesh0_pos[1]], 
-               'r-', alpha=0.8, linewidth=4, label='Backhaul Link')
-        
-        # Draw mesh hop chain connections (Mesh0 -> Mesh1 -> Mesh2 -> Mesh3)
+        internet_pos = (30.0, self.field_size + 50)  # Outside the 400x400 field
+        segments = []
+        link_styles = []
+        # Backhaul connection to first mesh node only (Mesh0) - RED
+        segments.append([self.node_positions[0], self.node_positions[1]])
+        link_styles.append(('Backhaul Link', 'red', 0.8, 4, '-'))
+        
+        # Mesh hop chain connections (Mesh0 -> Mesh1 -> Mesh2 -> Mesh3)
         for i in range(1, self.n_mesh_hops):
-            pos1 = self.node_positions[i]
-            pos2 = self.node_positions[i + 1]
-            ax.plot([pos1[0], pos2[0]], [pos1[1], pos2[1]], 
-                   'r-', alpha=0.6, linewidth=2, label='Mesh Chain' if i == 1 else "")
-        
-        # Draw STA to mesh connections
-        for i in range(5, 5 + self.n_total_stas):
-            sta_pos = self.node_positions[i]
-            mesh_idx = (i - 5) // self.n_sta_per_mesh + 1
-            mesh_pos = self.node_positions[mesh_idx]
-            ax.plot([sta_pos[0], mesh_pos[0]], [sta_pos[1], mesh_pos[1]], 
-                   'g--', alpha=0.2, linewidth=0.5)
+            segments.append([self.node_positions[i], self.node_positions[i + 1]])
+            link_styles.append(('Mesh Chain', 'red', 0.6, 2, '-'))
+        
+        # Connection from internet server to backhaul
+        segments.append([internet_pos, self.node_positions[0]])
+        link_styles.append(('Internet Link', 'green', 0.8, 3, '--'))
+        
+        # Static links share one LineCollection; zorder 2 matches Line2D
+        _, link_colors, alphas, widths, styles = zip(*link_styles)
+        ax.add_collection(LineCollection(segments, colors=[to_rgba(c, a) for c, a in zip(link_colors, alphas)],
+                                         linewidths=widths, linestyles=styles, zorder=2))
+        link_handles = {}
+        for label, color, alpha, width, style in link_styles:
+            link_handles.setdefault(label, Line2D([], [], color=color, alpha=alpha,
+                                                  linewidth=width, linestyle=style))
+        
+        # STA to mesh connections follow the STAs, so they get their own
+        # collection whose STA endpoints are rewritten per frame
+        sta = self.node_positions[5:5 + self.n_total_stas]
+        sta_links = LineCollection(np.stack([sta, self.node_positions[self._sta_mesh]], axis=1), colors='g', linestyles='--',
+                                   linewidths=0.5, alpha=0.2, zorder=2)
+        ax.add_collection(sta_links)
         
         # Note: Sayed and Sadia communicate through the mesh network, no direct link
+        return sta_links, link_handles
     
-    def animate_frame(self, frame):
-        """Animation frame update function"""
-        time = frame / self.fps
-        
-        # Clear the plot
-        self.ax.clear()
-        
-        # Update node positions (only STA nodes move)
-        self._simulate_node_movement(time)
-        
-        # Get building positions
-        buildings = self._get_building_positions(time)
+    def _add_legend(self, ax, link_handles, **kwargs):
+        """Legend with the link proxies around the labelled node markers"""
+        handles, labels = ax.get_legend_handles_labels()
+        legend_items = list(link_handles.items())
+        legend_items[2:2] = zip(labels, handles)
+        labels, handles = zip(*legend_items)
+        return ax.legend(handles, labels, loc='upper right', **kwargs)
+    
+    def _create_artists(self):
+        """Create every artist once; animate_frame only moves the mobile ones"""
+        ax = self.ax
         
         # Draw field (extended to show internet server)
-        self.ax.set_xlim(-20, self.field_size + 20)
-        self.ax.set_ylim(-20, self.field_size + 100)  # Extra space for internet server
-        self.ax.set_aspect('equal')
-        self.ax.grid(True, alpha=0.3)
-        self.ax.set_title(f'WiFi Mesh Backhaul Network - Time: {time:.1f}s\n'
-                         f'Backhaul→Mesh→STA + Sayed↔Sadia + Internet Server')
+        ax.set_xlim(-20, self.field_size + 20)
+        ax.set_ylim(-20, self.field_size + 100)  # Extra space for internet server
+        # Limits are fixed; adding or moving artists must not rescale the view
+        ax.set_autoscale_on(False)
+        ax.use_sticky_edges = False
+        ax.set_aspect('equal')
+        ax.grid(True, alpha=0.3)
+        self._title = ax.set_title('')
         
         # Draw buildings
-        for building in buildings:
+        self._building_rects = []
+        self._building_texts = []
+        for building in self._get_building_positions(0):
             rect = plt.Rectangle((building["x"], building["y"]), 
                                building["w"], building["h"],
                                facecolor='#8B4513', alpha=0.8,  # Dark brown color
                                edgecolor='black', linewidth=1)
-            self.ax.add_patch(rect)
+            ax.add_patch(rect)
+            self._building_rects.append(rect)
             
             # Add building height indicator
+            text = None
             if building["height"] > 10:
                 height_text = f"{building['name']}\n({building['height']:.0f}m)"
-                self.ax.text(building["x"] + building["w"]/2, 
-                           building["y"] + building["h"]/2, 
-                           height_text, ha='center', va='center', 
-                           fontsize=8, weight='bold')
+                text = ax.text(building["x"] + building["w"]/2, 
+                              building["y"] + building["h"]/2, 
+                              height_text, ha='center', va='center', 
+                              fontsize=8, weight='bold')
+            self._building_texts.append(text)
+        
+        # Static buildings come first and never move
+        n_static = len(self._static_building_list)
+        self._mobile_rects = self._building_rects[n_static:]
+        self._mobile_texts = self._building_texts[n_static:]
         
         # Draw network connections
-        self._draw_network_connections(self.ax)
-        
-        # Draw nodes with trails
-        for i, (pos, node_type, color) in enumerate(zip(self.node_positions, self.node_types, self.node_colors)):
-            # Draw trail for mobile nodes
-            if i >= 5 and i < 13 and len(self.node_trails[i]) > 1:  # STA nodes
-                trail_x = [p[0] for p in self.node_trails[i]]
-                trail_y = [p[1] for p in self.node_trails[i]]
-                self.ax.plot(trail_x, trail_y, color=color, alpha=0.3, linewidth=1)
-            
-            # Draw node
-            if node_type == "Backhaul":
-                self.ax.scatter(pos[0], pos[1], c=color, s=200, marker='^', 
-                              edgecolors='black', linewidth=2, label='Backhaul' if i == 0 else "")
-            elif node_type.startswith("Mesh"):
-                self.ax.scatter(pos[0], pos[1], c=color, s=150, marker='s', 
-                              edgecolors='black', linewidth=2, label='Mesh Hops' if i == 1 else "")
-            elif node_type.startswith("STA"):
-                self.ax.scatter(pos[0], pos[1], c=color, s=100, marker='o', 
-                              edgecolors='black', linewidth=1, label='STA Nodes' if i == 5 else "")
-            elif node_type == "Sayed":
-                self.ax.scatter(pos[0], pos[1], c=color, s=180, marker='D', 
-                              edgecolors='black', linewidth=2, label='Sayed')
-            elif node_type == "Sadia":
-                self.ax.scatter(pos[0], pos[1], c=color, s=180, marker='D', 
-                              edgecolors='black', linewidth=2, label='Sadia')
-            
-            # Add node labels
+        self._sta_links, link_handles = self._draw_network_connections(ax)
+        
+        # Trails for mobile nodes
+        self._trail_lines = {}
+        for i in self._node_groups["sta"]:
+            self._trail_lines[i], = ax.plot([], [], color=self.node_colors[i], alpha=0.3, linewidth=1)
+        
+        # Draw nodes, one scatter per node group
+        group_styles = {
+            "backhaul": dict(s=200, marker='^', linewidth=2, label='Backhaul'),
+            "mesh": dict(s=150, marker='s', linewidth=2, label='Mesh Hops'),
+            "sta": dict(s=100, marker='o', linewidth=1, label='STA Nodes'),
+            "sayed": dict(s=180, marker='D', linewidth=2, label='Sayed'),
+            "sadia": dict(s=180, marker='D', linewidth=2, label='Sadia'),
+        }
+        self._scatters = {}
+        for name, idx in self._node_groups.items():
+            pos = self.node_positions[idx]
+            self._scatters[name] = ax.scatter(pos[:, 0], pos[:, 1],
+                                              c=[self.node_colors[i] for i in idx],
+                                              edgecolors='black', **group_styles[name])
+        
+        # Add node labels as plain Text artists offset in points from the node,
+        # so moving a label is a single set_position
+        def offset(dx, dy):
+            return offset_copy(ax.transData, fig=self.fig, x=dx, y=dy, units='points')
+        
+        self._node_labels = []
+        for i, (pos, node_type) in enumerate(zip(self.node_positions.tolist(), self.node_types)):
             if i == 0:  # Backhaul
-                self.ax.annotate('Backhaul\n(Gateway)', pos, xytext=(10, 10), 
-                               textcoords='offset points', fontsize=8, weight='bold')
+                label = ax.text(*pos, 'Backhaul\n(Gateway)', transform=offset(10, 10), 
+                                fontsize=8, weight='bold')
             elif i >= 1 and i <= self.n_mesh_hops:  # Mesh nodes
-                self.ax.annotate(f'Mesh{i-1}', pos, xytext=(5, 5), 
-                               textcoords='offset points', fontsize=8)
+                label = ax.text(*pos, f'Mesh{i-1}', transform=offset(5, 5), fontsize=8)
             elif i >= 5 and i < 5 + self.n_total_stas:  # STA nodes
-                self.ax.annotate(f'STA{i-5}', pos, xytext=(5, -15), 
-                               textcoords='offset points', fontsize=7)
+                label = ax.text(*pos, f'STA{i-5}', transform=offset(5, -15), fontsize=7)
             elif node_type in ["Sayed", "Sadia"]:
-                self.ax.annotate(node_type, pos, xytext=(10, 10), 
-                               textcoords='offset points', fontsize=10, weight='bold')
+                label = ax.text(*pos, node_type, transform=offset(10, 10), 
+                                fontsize=10, weight='bold')
+            self._node_labels.append(label)
         
         # Add internet server indicator (outside the playground)
         internet_x, internet_y = 30.0, self.field_size + 50  # Outside the 400x400 field
-        self.ax.scatter(internet_x, internet_y, c='green', s=120, marker='*', 
-                       edgecolors='black', linewidth=2, label='Internet Server')
-        self.ax.annotate('Internet\nServer', (internet_x, internet_y), 
-                        xytext=(10, 10), textcoords='offset points', 
-                        fontsize=8, weight='bold')
-        
-        # Draw connection from internet server to backhaul
-        backhaul_pos = self.node_positions[0]
-        self.ax.plot([internet_x, backhaul_pos[0]], [internet_y, backhaul_pos[1]], 
-                    'g--', alpha=0.8, linewidth=3, label='Internet Link')
+        ax.scatter(internet_x, internet_y, c='green', s=120, marker='*', 
+                  edgecolors='black', linewidth=2, label='Internet Server')
+        ax.annotate('Internet\nServer', (internet_x, internet_y), 
+                   xytext=(10, 10), textcoords='offset points', 
+                   fontsize=8, weight='bold')
         
         # Add legend
-        self.ax.legend(loc='upper right', fontsize=8, framealpha=0.8)
+        self._legend = self._add_legend(ax, link_handles, fontsize=8, framealpha=0.8)
+        
+        # Time and statistics box, text filled in per frame
+        self._stats_text = ax.text(0.02, 0.98, '', transform=ax.transAxes, 
+                                  fontsize=10, verticalalignment='top',
+                                  bbox=dict(boxstyle='round', facecolor='white', alpha=0.8))
+        
+        # Only these change between frames; everything else is static background
+        self._dynamic_artists = [*self._mobile_rects,
+                                 *[t for t in self._mobile_texts if t is not None],
+                                 self._sta_links, *self._trail_lines.values(),
+                                 self._scatters["sta"],
+                                 *[self._node_labels[i] for i in self._node_groups["sta"]],
+                                 self._title, self._stats_text]
+    
+    def _init_artists(self):
+        """Reset the mobile nodes and their trails (FuncAnimation init_func)"""
+        self.node_positions = self.initial_node_positions.copy()
+        for line in self._trail_lines.values():
+            line.set_data([], [])
+        return self._dynamic_artists
+    
+    def animate_frame(self, frame):
+        """Animation frame update function"""
+        time = frame / self.fps
         
-        # Add time and statistics
-        stats_text = f"Time: {time:.1f}s | Nodes: {self.n_total_nodes} | " \
-                    f"Mesh Hops: {self.n_mesh_hops} | STA Nodes: {self.n_total_stas}"
-        self.ax.text(0.02, 0.98, stats_text, transform=self.ax.transAxes, 
-                    fontsize=10, verticalalignment='top',
-                    bbox=dict(boxstyle='round', facecolor='white', alpha=0.8))
+        # Update node positions (only STA nodes move)
+        self._simulate_node_movement(frame)
+        
+        # Move mobile buildings
+        for rect, text, building in zip(self._mobile_rects, self._mobile_texts,
+                                        self.mobile_buildings):
+            x, y = self._mobile_tracks[building["name"]][frame]
+            rect.set_xy((x, y))
+            if text is not None:
+                text.set_position((x + building["w"]/2, y + building["h"]/2))
+        
+        # Move STAs with their trails, labels and mesh links
+        sta = self._node_groups["sta"]
+        self._scatters["sta"].set_offsets(self.node_positions[sta])
+        self._sta_links.set_segments(np.stack([self.node_positions[sta],
+                                               self.node_positions[self._sta_mesh]], axis=1))
+        trail = self._trail(frame)
+        for k, i in enumerate(sta):
+            pos = self.node_positions[i]
+            if len(trail) > 1:
+                self._trail_lines[i].set_data(trail[:, k, 0], trail[:, k, 1])
+            self._node_labels[i].set_position(tuple(pos))
+        
+        self._title.set_text(f'WiFi Mesh Backhaul Network - Time: {time:.1f}s\n'
+                             f'Backhaul→Mesh→STA + Sayed↔Sadia + Internet Server')
+        self._stats_text.set_text(f"Time: {time:.1f}s | Nodes: {self.n_total_nodes} | "
+                                  f"Mesh Hops: {self.n_mesh_hops} | STA Nodes: {self.n_total_stas}")
+        return self._dynamic_artists
+    
+    def _pipe_frames_to_ffmpeg(self, output_file):
+        """Render each frame on the figure canvas and stream the raw RGBA buffer to ffmpeg"""
+        canvas = self.fig.canvas
+        self._init_artists()
+        
+        # Static scene is rendered once; the legend is redrawn so moving
+        # artists never cover it
+        blit = BlitManager(self.fig, [*self._dynamic_artists, self._legend])
+        blit.capture_background()
         
+        proc = None
+        try:
+            for frame in range(self.total_frames):
+                self.animate_frame(frame)
+                blit.update()
+                buf = canvas.buffer_rgba()
+                if proc is None:
+                    h, w = np.asarray(buf).shape[:2]
+                    proc = subprocess.Popen(
+                        [plt.rcParams['animation.ffmpeg_path'], "-y", "-loglevel", "error",
+                         "-f", "rawvideo", "-pix_fmt", "rgba", "-s", f"{w}x{h}",
+                         "-r", str(self.fps), "-i", "-",
+                         "-c:v", "libx264", "-pix_fmt", "yuv420p", "-b:v", "1800k",
+                         output_file],
+                        stdin=subprocess.PIPE)
+                proc.stdin.write(buf)
+        finally:
+            if proc is not None:
+                proc.stdin.close()
+                proc.wait()
+        # No frames means ffmpeg was never started
+        if proc is not None and proc.returncode != 0:
+            raise RuntimeError(f"ffmpeg exited with status {proc.returncode}")
     
     def create_animation(self):
         """Create and save the animation"""
         # Create figure and axis
         self.fig, self.ax = plt.subplots(figsize=(14, 12))
+        # The scene extents are fixed, so are the margins
+        self.fig.subplots_adjust(left=0.06, right=0.98, top=0.94, bottom=0.06)
+        self._create_artists()
         
-        # Create animation
-        anim = animation.FuncAnimation(self.fig, self.animate_frame, 
-                                     frames=self.total_frames, 
-                                     interval=1000/self.fps, 
-                                     blit=False, repeat=True)
+        # The static overview is the same scene before anything moves
+        self.create_static_overview()
         
-        # Save animation
+        # A 2 fps preview does not need full resolution: 1008x864 frames
+        self.fig.set_dpi(72)
+        
+        # Save animation; artists are built once and only the mobile ones
+        # are touched per frame
         output_file = os.path.join(self.output_dir, "wifi_mesh_backhaul_animation.mp4")
         print(f"Creating animation: {output_file}")
         
         try:
-            anim.save(output_file, writer='ffmpeg', fps=self.fps, bitrate=1800)
+            self._pipe_frames_to_ffmpeg(output_file)
             print(f"Animation saved: {output_file}")
         except Exception as e:
             print(f"Error saving animation: {e}")
             print("Saving as GIF instead...")
+            anim = animation.FuncAnimation(self.fig, self.animate_frame, 
+                                         init_func=self._init_artists,
+                                         frames=self.total_frames, 
+                                         interval=1000/self.fps, 
+                                         blit=True, repeat=True)
             output_file = os.path.join(self.output_dir, "wifi_mesh_backhaul_animation.gif")
             anim.save(output_file, writer='pillow', fps=self.fps)
             print(f"Animation saved as GIF: {output_file}")
         
-        # Also create a static overview
-        self.create_static_overview()
-        
-        return anim
+        plt.close(self.fig)
+        return output_file
     
     def create_static_overview(self):
-        """Create a static overview of the network topology"""
-        fig, ax = plt.subplots(figsize=(12, 10))
-        
-        # Set up the plot (extended to show internet server)
-        ax.set_xlim(-20, self.field_size + 20)
-        ax.set_ylim(-20, self.field_size + 100)  # Extra space for internet server
-        ax.set_aspect('equal')
-        ax.grid(True, alpha=0.3)
-        ax.set_title('WiFi Mesh Backhaul Network - Topology Overview', fontsize=14, weight='bold')
-        
-        # Draw buildings at time 0
-        buildings = self._get_building_positions(0.0)
-        for building in buildings:
-            rect = plt.Rectangle((building["x"], building["y"]), 
-                               building["w"], building["h"],
-                               facecolor='#8B4513', alpha=0.8,  # Dark brown color
-                               edgecolor='black', linewidth=1)
-            ax.add_patch(rect)
-            
-            if building["height"] > 10:
-                height_text = f"{building['name']}\n({building['height']:.0f}m)"
-                ax.text(building["x"] + building["w"]/2, 
-                       building["y"] + building["h"]/2, 
-                       height_text, ha='center', va='center', 
-                       fontsize=8, weight='bold')
-        
-        # Draw all nodes with initial positions
-        for i, (pos, node_type, color) in enumerate(zip(self.initial_node_positions, self.node_types, self.node_colors)):
-            if node_type == "Backhaul":
-                ax.scatter(pos[0], pos[1], c=color, s=200, marker='^', 
-                          edgecolors='black', linewidth=2, label='Backhaul Gateway')
-            elif node_type.startswith("Mesh"):
-                ax.scatter(pos[0], pos[1], c=color, s=150, marker='s', 
-                          edgecolors='black', linewidth=2, label='Mesh Hops' if i == 1 else "")
-            elif node_type.startswith("STA"):
-                ax.scatter(pos[0], pos[1], c=color, s=100, marker='o', 
-                          edgecolors='black', linewidth=1, label='STA Nodes' if i == 5 else "")
-            elif node_type == "Sayed":
-                ax.scatter(pos[0], pos[1], c=color, s=180, marker='D', 
-                          edgecolors='black', linewidth=2, label='Sayed')
-            elif node_type == "Sadia":
-                ax.scatter(pos[0], pos[1], c=color, s=180, marker='D', 
-                          edgecolors='black', linewidth=2, label='Sadia')
-            
-            # Add node labels
-            if i == 0:
-                ax.annotate('Backhaul', pos, xytext=(10, 10), 
-                           textcoords='offset points', fontsize=10, weight='bold')
-            elif i >= 1 and i <= self.n_mesh_hops:
-                ax.annotate(f'Mesh{i-1}', pos, xytext=(5, 5), 
-                           textcoords='offset points', fontsize=9)
-            elif i >= 5 and i < 5 + self.n_total_stas:
-                ax.annotate(f'STA{i-5}', pos, xytext=(5, -15), 
-                           textcoords='offset points', fontsize=7)
-            elif node_type in ["Sayed", "Sadia"]:
-                ax.annotate(node_type, pos, xytext=(10, 10), 
-                           textcoords='offset points', fontsize=10, weight='bold')
-        
-        # Draw network connections
-        self._draw_network_connections(ax)
-        
-        # Add internet server (outside the playground)
-        internet_x, internet_y = 30.0, self.field_size + 50  # Outside the 400x400 field
-        ax.scatter(internet_x, internet_y, c='green', s=120, marker='*', 
-                  edgecolors='black', linewidth=2, label='Internet Server')
-        ax.annotate('Internet\nServer', (internet_x, internet_y), 
-                   xytext=(10, 10), textcoords='offset points', 
-                   fontsize=10, weight='bold')
-        
-        # Draw connection from internet server to backhaul
-        backhaul_pos = self.node_positions[0]
-        ax.plot([internet_x, backhaul_pos[0]], [internet_y, backhaul_pos[1]], 
-               'g--', alpha=0.8, linewidth=3, label='Internet Link')
-        
-        # Add legend
-        ax.legend(loc='upper right', fontsize=10)
-        
+        """Save the scene in its initial state as the static topology overview"""
+        self._init_artists()
+        self._title.set_text('WiFi Mesh Backhaul Network - Topology Overview')
         
         # Save static overview
         output_file = os.path.join(self.output_dir, "wifi_mesh_backhaul_topology.png")
-        plt.tight_layout()
-        plt.savefig(output_file, dpi=300, bbox_inches='tight')
+        self.fig.savefig(output_file, dpi=300)
         print(f"Static overview saved: {output_file}")
-        plt.close()
 
 def main():
     """Main function to run the animation"""
@@ -508,7 +566,7 @@ def main():
     print(f"- STA nodes: {animator.n_total_stas}")
     print(f"- Sayed & Sadia: 2")
     
-    anim = animator.create_animation()
+    animator.create_animation()
     
     print("\nAnimation complete!")
     print(f"Files saved in: {output_dir}/")
@@ -1,10 +1,95 @@
 #!/usr/bin/env python3
-import markdown
 import weasyprint
+from markdown_it import MarkdownIt
 import os
 import base64
+import mmap
 import re
 from pathlib import Path
+from weasyprint.text.fonts import FontConfiguration
+
+# Markdown image syntax: ![alt](path)
+IMG_RE = re.compile(r'!\[([^\]]*)\]\(([^)]+)\)')
+
+# MIME types for embedded images, by lowercase file extension. markdown-it
+# only lets raster data: URIs through, so other images (SVG) keep their path
+MIME_MAP = {
+    '.png': 'image/png',
+    '.jpg': 'image/jpeg',
+    '.jpeg': 'image/jpeg',
+    '.gif': 'image/gif',
+    '.webp': 'image/webp',
+}
+
+# CommonMark parser with GFM tables, the same dialect as convert_to_pdf.py
+MD = MarkdownIt("commonmark").enable("table")
+
+# CSS styling for better PDF formatting, parsed once and shared by every
+# conversion together with the font configuration
+FONT_CFG = FontConfiguration()
+SHARED_CSS = weasyprint.CSS(string="""
+body {
+    font-family: Arial, sans-serif;
+    line-height: 1.6;
+    margin: 40px;
+    color: #333;
+}
+h1, h2, h3, h4, h5, h6 {
+    color: #2c3e50;
+    margin-top: 30px;
+    margin-bottom: 15px;
+}
+h1 {
+    border-bottom: 2px solid #3498db;
+    padding-bottom: 10px;
+}
+h2 {
+    border-bottom: 1px solid #bdc3c7;
+    padding-bottom: 5px;
+}
+table {
+    border-collapse: collapse;
+    width: 100%;
+    margin: 20px 0;
+}
+th, td {
+    border: 1px solid #ddd;
+    padding: 12px;
+    text-align: left;
+}
+th {
+    background-color: #f2f2f2;
+    font-weight: bold;
+}
+img {
+    max-width: 100%;
+    height: auto;
+    display: block;
+    margin: 20px auto;
+    border: 1px solid #ddd;
+    padding: 10px;
+    background-color: #f9f9f9;
+    page-break-inside: avoid;
+}
+code {
+    background-color: #f4f4f4;
+    padding: 2px 4px;
+    border-radius: 3px;
+    font-family: 'Courier New', monospace;
+}
+pre {
+    background-color: #f4f4f4;
+    padding: 15px;
+    border-radius: 5px;
+    overflow-x: auto;
+}
+blockquote {
+    border-left: 4px solid #3498db;
+    margin: 20px 0;
+    padding-left: 20px;
+    color: #666;
+}
+""", font_config=FONT_CFG)
 
 def convert_md_to_pdf(md_file, output_pdf):
     """Convert Markdown file to PDF with embedded images"""
@@ -16,7 +101,9 @@ def convert_md_to_pdf(md_file, output_pdf):
     # Get the directory of the markdown file
     md_dir = os.path.dirname(os.path.abspath(md_file))
     
-    # Convert images to base64 data URIs
+    # Convert images to base64 data URIs; repeated images are encoded once
+    uri_cache = {}
+    
     def embed_images(match):
         alt_text = match.group(1)
         img_path = match.group(2)
@@ -25,27 +112,28 @@ def convert_md_to_pdf(md_file, output_pdf):
         if not os.path.isabs(img_path):
             img_path = os.path.join(md_dir, img_path)
         
+        if img_path in uri_cache:
+            return f'![{alt_text}]({uri_cache[img_path]})'
+        
+        # Determine MIME type based on file extension
+        ext = os.path.splitext(img_path)[1].lower()
+        mime_type = MIME_MAP.get(ext)
+        if mime_type is None:
+            # WeasyPrint loads it from disk instead
+            return f'![{alt_text}]({img_path})'
+        
         # Check if image exists
         if os.path.exists(img_path):
             try:
-                # Read image and convert to base64
-                with open(img_path, 'rb') as img_file:
-                    img_data = img_file.read()
-                    img_base64 = base64.b64encode(img_data).decode('utf-8')
-                    
-                # Determine MIME type based on file extension
-                ext = os.path.splitext(img_path)[1].lower()
-                if ext == '.png':
-                    mime_type = 'image/png'
-                elif ext in ['.jpg', '.jpeg']:
-                    mime_type = 'image/jpeg'
-                elif ext == '.gif':
-                    mime_type = 'image/gif'
-                else:
-                    mime_type = 'image/png'  # default
+                # Encode straight from a read-only mapping of the file so the
+                # raw image bytes are never copied into a Python buffer
+                with open(img_path, 'rb') as img_file, \
+                        mmap.mmap(img_file.fileno(), 0, access=mmap.ACCESS_READ) as img_data:
+                    img_base64 = base64.b64encode(img_data).decode('ascii')
                 
                 # Create data URI
                 data_uri = f'data:{mime_type};base64,{img_base64}'
+                uri_cache[img_path] = data_uri
                 return f'![{alt_text}]({data_uri})'
             except Exception as e:
                 print(f"Error processing image {img_path}: {e}")
@@ -55,93 +143,10 @@ def convert_md_to_pdf(md_file, output_pdf):
             return f'![{alt_text}]({img_path})'
     
     # Process all images in the markdown
-    md_content = re.sub(r'!\[([^\]]*)\]\(([^)]+)\)', embed_images, md_content)
+    md_content = IMG_RE.sub(embed_images, md_content)
     
     # Convert markdown to HTML
-    html = markdown.markdown(md_content, extensions=['tables', 'fenced_code'])
-    
-    # Add CSS styling for better PDF formatting
-    css_style = """
-    <style>
-    body {
-        font-family: Arial, sans-serif;
-        line-height: 1.6;
-        margin: 40px;
-        color: #333;
-    }
-    h1, h2, h3, h4, h5, h6 {
-        color: #2c3e50;
-        margin-top: 30px;
-        margin-bottom: 15px;
-    }
-    h1 {
-        border-bottom: 2px solid #3498db;
-        padding-bottom: 10px;
-    }
-    h2 {
-        border-bottom: 1px solid #bdc3c7;
-        padding-bottom: 5px;
-    }
-    table {
-        border-collapse: collapse;
-        width: 100%;
-        margin: 20px 0;
-    }
-    th, td {
-        border: 1px solid #ddd;
-        padding: 12px;
-        text-align: left;
-    }
-    th {
-        background-color: #f2f2f2;
-        font-weight: bold;
-    }
-    img {
-        max-width: 100%;
-        height: auto;
-        display: block;
-        margin: 20px auto;
-        border: 1px solid #ddd;
-        padding: 10px;
-        background-color: #f9f9f9;
-        page-break-inside: avoid;
-    }
-    .figure {
-        text-align: center;
-        margin: 20px 0;
-        page-break-inside: avoid;
-    }
-    .figure img {
-        margin: 10px auto;
-    }
-    .figure p {
-        font-style: italic;
-        color: #666;
-        margin-top: 10px;
-    }
-    code {
-        background-color: #f4f4f4;
-        padding: 2px 4px;
-        border-radius: 3px;
-        font-family: 'Courier New', monospace;
-    }
-    pre {
-        background-color: #f4f4f4;
-        padding: 15px;
-        border-radius: 5px;
-        overflow-x: auto;
-    }
-    blockquote {
-        border-left: 4px solid #3498db;
-        margin: 20px 0;
-        padding-left: 20px;
-        color: #666;
-    }
-    .page-break {
-        page-break-before: always;
-    }
-    </style>
-    """
+    html = MD.render(md_content)
     
     # Create complete HTML document
     html_doc = f"""
@@ -150,7 +155,6 @@ def convert_md_to_pdf(md_file, output_pdf):
     <head>
         <meta charset="utf-8">
         <title>Network Simulation Analysis Report</title>
-        {css_style}
     </head>
     <body>
         {html}
@@ -159,7 +163,10 @@ def convert_md_to_pdf(md_file, output_pdf):
     """
     
     # Convert HTML to PDF
-    weasyprint.HTML(string=html_doc).write_pdf(output_pdf)
+    with open(output_pdf, 'wb', buffering=1024 * 1024) as out:
+        weasyprint.HTML(string=html_doc, base_url=md_dir).write_pdf(
+            out, stylesheets=[SHARED_CSS], font_config=FONT_CFG,
+            presentational_hints=False, optimize_images=True, jpeg_quality=85)
     print(f"Successfully converted {md_file} to {output_pdf}")
 
 if __name__ == "__main__":
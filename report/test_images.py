@@ -1,6 +1,7 @@
 #!/usr/bin/env python3
 import weasyprint
 import base64
+import mmap
 import os
 
 def test_image_embedding():
@@ -10,9 +11,8 @@ def test_image_embedding():
     img_path = "/home/sayed/ns-3-dev/report/network_topology.png"
     
     if os.path.exists(img_path):
-        with open(img_path, 'rb') as f:
-            img_data = f.read()
-            img_base64 = base64.b64encode(img_data).decode('utf-8')
+        with open(img_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as img_data:
+            img_base64 = base64.b64encode(img_data).decode('ascii')
         
         html_content = f"""
         <!DOCTYPE html>
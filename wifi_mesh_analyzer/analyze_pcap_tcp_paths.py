@@ -1,14 +1,19 @@
 #!/usr/bin/env python3
+import io
 import os
-import re
 import subprocess
 import csv
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from glob import glob
+import numpy as np
+import pandas as pd
 
 OUT_DIR = "wifi_mesh_outputs"
 PCAP_GLOB = os.path.join(OUT_DIR, "wifi_mesh_playfield_rw_pcap-*.pcap")
 
-node_from_file_re = re.compile(r"rw_pcap-(?P<node>\d+)\.pcap$")
+# Column names for the tshark fields requested in collect_tcp_events
+EVENT_COLUMNS = ["time", "ip_id", "src_ip", "dst_ip", "dst_port", "length"]
 
 def tshark_available() -> bool:
     try:
@@ -17,9 +22,12 @@ def tshark_available() -> bool:
     except FileNotFoundError:
         return False
 
-def run_tshark_fields(pcap_path: str, display_filter: str, fields: list[str]) -> list[list[str]]:
+def run_tshark_fields(pcap_path: str, display_filter: str, fields: list[str],
+                      names: list[str]) -> pd.DataFrame:
+    # -n: no name resolution; reassembly is not needed for per-packet fields
     cmd = [
-        "tshark", "-r", pcap_path,
+        "tshark", "-r", pcap_path, "-n",
+        "-o", "tcp.desegment_tcp_streams:FALSE",
         "-Y", display_filter,
         "-T", "fields"
     ]
@@ -28,69 +36,91 @@ def run_tshark_fields(pcap_path: str, display_filter: str, fields: list[str]) ->
     # ensure one record per line
     cmd += ["-E", "separator=,", "-E", "occurrence=f"]
     res = subprocess.run(cmd, capture_output=True, text=True, check=False)
-    if res.returncode != 0:
-        return []
-    lines = [ln.strip() for ln in res.stdout.splitlines() if ln.strip()]
-    rows = [ln.split(",") for ln in lines]
-    return rows
-
-def collect_tcp_events(dst_ip: str, dst_port: int) -> list[dict]:
-    events: list[dict] = []
+    if res.returncode != 0 or not res.stdout.strip():
+        return pd.DataFrame(columns=names)
+    # Parse the whole output column-wise in pandas' C reader
+    return pd.read_csv(io.StringIO(res.stdout), header=None, names=names,
+                       dtype={"src_ip": str, "dst_ip": str}, engine="c")
+
+def merge_pcaps(pcaps: list[str], merged_path: str) -> bool:
+    # -I none keeps one interface per input file, so frame.interface_id
+    # identifies the capture (and node) each merged frame came from
+    cmd = ["mergecap", "-I", "none", "-w", merged_path] + pcaps
+    try:
+        res = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=False)
+    except FileNotFoundError:
+        return False
+    return res.returncode == 0
+
+def typed_events(frame: pd.DataFrame) -> pd.DataFrame:
+    # Cast the numeric fields in one pass; unparsable values become NaN
+    frame = frame.assign(**{c: pd.to_numeric(frame[c], errors="coerce")
+                            for c in ("time", "ip_id", "dst_port", "length")})
+    # Drop incomplete records; a missing tcp.len counts as 0 bytes
+    frame = frame.dropna(subset=["time", "ip_id", "dst_port"])
+    frame = frame.fillna({"length": 0})
+    return frame.astype({"time": "float64", "ip_id": "uint32",
+                         "dst_port": "uint16", "length": "uint32"})
+
+def collect_tcp_events(dst_ip: str, dst_port: int) -> pd.DataFrame:
+    frames: list[pd.DataFrame] = []
+    pcaps: list[tuple[int, str]] = []
     for pcap in sorted(glob(PCAP_GLOB)):
-        m = node_from_file_re.search(pcap)
-        if not m:
-            continue
-        node = int(m.group("node"))
-        # Only data packets for this flow (exclude SYN/ACK only by requiring tcp.len>0)
-        df = f"ip && tcp && ip.dst=={dst_ip} && tcp.dstport=={dst_port} && tcp.len>0"
-        rows = run_tshark_fields(
-            pcap, df,
-            fields=["frame.time_epoch", "ip.id", "ip.src", "ip.dst", "tcp.dstport", "tcp.len"]
-        )
-        for r in rows:
-            try:
-                t = float(r[0])
-                ip_id = int(r[1])
-                src = r[2]
-                dst = r[3]
-                dport = int(r[4])
-                length = int(r[5]) if r[5] else 0
-            except Exception:
-                continue
-            events.append({
-                "time": t,
-                "node": node,
-                "ip_id": ip_id,
-                "src_ip": src,
-                "dst_ip": dst,
-                "dst_port": dport,
-                "length": length,
-            })
-    events.sort(key=lambda x: (x["ip_id"], x["time"]))
-    return events
-
-def reconstruct_paths_from_events(events: list[dict]) -> list[dict]:
+        # Node id is the <N> in "...rw_pcap-<N>.pcap"
+        tail = os.path.basename(pcap).rpartition("rw_pcap-")[2]
+        stem = tail[:-5] if tail.endswith(".pcap") else ""
+        if stem.isdigit():
+            pcaps.append((int(stem), pcap))
+    # Only data packets for this flow (exclude SYN/ACK only by requiring tcp.len>0)
+    df = f"ip && tcp && ip.dst=={dst_ip} && tcp.dstport=={dst_port} && tcp.len>0"
+    fields = ["frame.time_epoch", "ip.id", "ip.src", "ip.dst", "tcp.dstport", "tcp.len"]
+
+    # One tshark run over all captures merged together; falls back to one
+    # run per capture when mergecap is not available
+    with tempfile.TemporaryDirectory() as tmp:
+        merged = os.path.join(tmp, "merged.pcapng")
+        if pcaps and merge_pcaps([pcap for _, pcap in pcaps], merged):
+            ev = run_tshark_fields(merged, df, fields + ["frame.interface_id"],
+                                   EVENT_COLUMNS + ["interface_id"])
+            # Map each capture interface back to the node it was recorded on
+            iface = pd.to_numeric(ev.pop("interface_id"), errors="coerce")
+            ev["node"] = iface.map(dict(enumerate(node for node, _ in pcaps)))
+            frames.append(typed_events(ev.dropna(subset=["node"])))
+        else:
+            # Captures are independent and tshark runs in its own process,
+            # so dissect them concurrently
+            def process_one(item: tuple[int, str]) -> pd.DataFrame:
+                node, pcap = item
+                ev = typed_events(run_tshark_fields(pcap, df, fields, EVENT_COLUMNS))
+                ev["node"] = node
+                return ev
+            with ThreadPoolExecutor(max_workers=os.cpu_count()) as ex:
+                frames.extend(ex.map(process_one, pcaps))
+    if not frames:
+        return pd.DataFrame(columns=["time", "node"] + EVENT_COLUMNS[1:])
+    events = pd.concat(frames, ignore_index=True)
+    events["node"] = events["node"].astype("int64")
+    events = events[["time", "node"] + EVENT_COLUMNS[1:]]
+    return events.sort_values(["ip_id", "time"], kind="stable", ignore_index=True)
+
+def reconstruct_paths_from_events(events: pd.DataFrame) -> list[dict]:
     paths: list[dict] = []
-    if not events:
+    if events.empty:
         return paths
-    # group by ip_id preserving order
-    by_id: dict[int, list[dict]] = {}
-    for ev in events:
-        by_id.setdefault(ev["ip_id"], []).append(ev)
-    for ip_id, lst in by_id.items():
-        # sort by time across nodes
-        lst.sort(key=lambda x: x["time"]) 
-        hop_nodes: list[int] = []
-        for ev in lst:
-            if not hop_nodes or hop_nodes[-1] != ev["node"]:
-                hop_nodes.append(ev["node"])
-        if not lst:
-            continue
+    # events are already sorted by (ip_id, time), so each group is in time order
+    for ip_id, lst in events.groupby("ip_id", sort=False):
+        # Keep a node only where it differs from the previous event's node
+        nodes = lst["node"].to_numpy()
+        keep = np.empty(len(nodes), dtype=bool)
+        keep[0] = True
+        keep[1:] = nodes[1:] != nodes[:-1]
+        hop_nodes = nodes[keep].tolist()
+        first = lst.iloc[0]
         paths.append({
-            "ip_id": ip_id,
-            "src_ip": lst[0]["src_ip"],
-            "dst_ip": lst[0]["dst_ip"],
-            "dst_port": lst[0]["dst_port"],
+            "ip_id": int(ip_id),
+            "src_ip": first["src_ip"],
+            "dst_ip": first["dst_ip"],
+            "dst_port": int(first["dst_port"]),
             "hops": "->".join(map(str, hop_nodes)),
             "hop_count": len(hop_nodes),
         })
@@ -101,10 +131,11 @@ def write_csv(rows: list[dict], out_path: str) -> None:
     if not rows:
         return
     os.makedirs(os.path.dirname(out_path), exist_ok=True)
-    with open(out_path, "w", newline="") as f:
-        w = csv.DictWriter(f, fieldnames=list(rows[0].keys()))
-        w.writeheader()
-        w.writerows(rows)
+    header = list(rows[0].keys())
+    with open(out_path, "w", newline="", buffering=1 << 20) as f:
+        w = csv.writer(f)
+        w.writerow(header)
+        w.writerows(tuple(r.values()) for r in rows)
 
 def main():
     if not tshark_available():
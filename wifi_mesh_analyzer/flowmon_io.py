@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+# Shared FlowMonitor XML reader for the WiFi mesh analysis scripts.
+import os
+import pickle
+import xml.etree.ElementTree as ET
+import numpy as np
+import pandas as pd
+
+def parse_time_to_seconds(value: str) -> float:
+    """Convert strings like '+2.0e+09ns', '25ms', '1.2s' to seconds (float)."""
+    if value is None:
+        return 0.0
+    v = value.strip()
+    if v.endswith('ns'):
+        return float(v[:-2]) / 1e9
+    if v.endswith('us'):
+        return float(v[:-2]) / 1e6
+    if v.endswith('ms'):
+        return float(v[:-2]) / 1e3
+    if v.endswith('s'):
+        return float(v[:-1])
+    return float(v)
+
+def get_int(elem, attr, default=0):
+    """Safely read integer attributes; return default if missing/invalid."""
+    v = elem.get(attr)
+    try:
+        return int(v) if v is not None and v != '' else default
+    except Exception:
+        return default
+
+# Per-flow attributes copied into the DataFrame, in column order
+TIME_FIELDS = ('timeFirstTxPacket', 'timeFirstRxPacket', 'timeLastTxPacket', 'timeLastRxPacket',
+               'delaySum', 'jitterSum', 'lastDelay', 'maxDelay', 'minDelay')
+COUNT_FIELDS = ('txBytes', 'rxBytes', 'txPackets', 'rxPackets', 'lostPackets', 'timesForwarded')
+
+# Stored with every flow cache; bump it whenever parse_flowmon_xml changes
+# what it returns so caches written by older code are reparsed
+FLOWS_CACHE_VERSION = 1
+
+def parse_flowmon_xml(xml_file):
+    """Parse FlowMonitor XML file and extract per-flow statistics into a DataFrame."""
+    # One list per column; converted to typed arrays once parsing is done
+    flow_ids = []
+    times = {name: [] for name in TIME_FIELDS}
+    counts = {name: [] for name in COUNT_FIELDS}
+    # Stream <Flow> entries instead of building the whole tree; the stack of
+    # open elements lets each processed Flow be detached from its parent.
+    parents = []
+    for event, flow in ET.iterparse(xml_file, events=('start', 'end')):
+        if event == 'start':
+            parents.append(flow)
+            continue
+        parents.pop()
+        if flow.tag != 'Flow':
+            continue
+        flow_id = get_int(flow, 'flowId', default=-1)
+        if flow_id >= 0:
+            flow_ids.append(flow_id)
+            for name, column in times.items():
+                column.append(parse_time_to_seconds(flow.get(name)))
+            for name, column in counts.items():
+                column.append(get_int(flow, name))
+        # Drop the processed element so memory stays flat
+        flow.clear()
+        if parents:
+            parents[-1].remove(flow)
+    
+    # Return as a pandas DataFrame for convenient plotting/aggregation,
+    # built column-wise with explicit dtypes instead of inferring them.
+    columns = {'flowId': np.array(flow_ids, dtype=np.int64)}
+    columns.update((name, np.array(column, dtype=np.float64)) for name, column in times.items())
+    columns.update((name, np.array(column, dtype=np.int64)) for name, column in counts.items())
+    return pd.DataFrame(columns)
+
+def load_flows(xml_file):
+    """Return parse_flowmon_xml(xml_file), reusing a pickled copy next to the XML.
+
+    The cache is used while it is at least as new as the XML and was written
+    with the current FLOWS_CACHE_VERSION, so every script reading the same
+    FlowMonitor run parses it only once.
+    """
+    cache_file = os.path.splitext(xml_file)[0] + '.flows.pkl'
+    if os.path.exists(cache_file) and os.path.getmtime(cache_file) >= os.path.getmtime(xml_file):
+        try:
+            with open(cache_file, 'rb') as f:
+                version, df = pickle.load(f)
+            if version == FLOWS_CACHE_VERSION:
+                return df
+        except Exception as e:
+            print(f"Ignoring unreadable flow cache {cache_file}: {e}")
+    
+    df = parse_flowmon_xml(xml_file)
+    try:
+        with open(cache_file, 'wb') as f:
+            pickle.dump((FLOWS_CACHE_VERSION, df), f)
+    except OSError as e:
+        print(f"Could not cache parsed flows: {e}")
+    return df